@@ -0,0 +1,368 @@
+"""放置搜尋 AI：列舉目前方塊所有可到達的落點（左右移、SRS kick、軟降 tuck），
+以特徵加權評分，並可利用 next / hold 往後看。"""
+from collections import deque
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from board import Board, FULL_ROW, clear_columns, column_stats, lock_columns, summarize
+from cache import LRUCache
+from settings import BOARD_COLS, BOARD_ROWS
+from tetromino import ROTATIONS, Tetromino
+import engine
+
+# 特徵權重（正值加分、負值扣分），可整組替換
+DEFAULT_WEIGHTS: Dict[str, float] = {
+    "aggregate_height": -0.51,
+    "lines":             0.76,
+    "holes":            -0.36,
+    "bumpiness":        -0.18,
+    "wells":            -0.10,
+}
+
+# 搜尋時可用的輸入（SOFT_DROP 在搜尋中代表「降到底」，路徑會展開成多次單格軟降）
+_MOVES = ((engine.LEFT, -1, None), (engine.RIGHT, 1, None), (engine.ROTATE, 0, 1), (engine.ROTATE_CCW, 0, -1))
+
+
+class Placement(NamedTuple):
+    """一個落點：方塊最終狀態與到達該處的輸入序列（以 HARD_DROP 結尾）。"""
+
+    shape: str
+    r: int
+    x: int
+    y: int
+    actions: Tuple[str, ...]
+
+
+class Move(NamedTuple):
+    """best_move 的結果。"""
+
+    placement: Placement
+    hold: bool
+    score: float
+    actions: Tuple[str, ...]
+
+
+def _column_bottoms():
+    """[shape][r] → ((欄偏移, 該欄最低格的列偏移), ...)"""
+    table = {}
+    for key, states in ROTATIONS.items():
+        per_r = []
+        for o in states:
+            low = {}
+            for c, r in o.cells:
+                low[c] = max(low.get(c, r), r)
+            per_r.append(tuple(sorted(low.items())))
+        table[key] = tuple(per_r)
+    return table
+
+_BOTTOMS = _column_bottoms()
+
+
+class _Rows:
+    """只有佔用 bitmask 的盤面；搜尋時取代完整 Board（共用同一個 valid_position）。"""
+
+    __slots__ = ("rows",)
+    valid_position = Board.valid_position
+
+    def __init__(self, rows):
+        self.rows = rows
+
+
+# ---------- 落點列舉 ----------
+def placements(board, piece: Tetromino) -> List[Placement]:
+    """回傳 piece 從目前位置可到達的所有落點，重複的最終佔用格只保留輸入最短者。"""
+    probe = Tetromino(piece.shape_key)
+    start = (piece.r, piece.x, piece.y)
+    parent = {start: None}
+    queue = deque([start])
+    found = {}
+    valid = board.valid_position
+    bottoms = _BOTTOMS[piece.shape_key]
+
+    # 每欄最上方的已佔用列；方塊完全在其上方時可直接算出落下距離
+    tops = [BOARD_ROWS] * BOARD_COLS
+    seen = 0
+    for ty, row in enumerate(board.rows):
+        new = row & ~seen
+        while new:
+            low = new & -new
+            tops[low.bit_length() - 1] = ty
+            new ^= low
+        seen |= row
+
+    while queue:
+        state = queue.popleft()
+        r, x, y = state
+        for action, dx, rot in _MOVES:
+            probe.r, probe.x, probe.y = r, x, y
+            if rot is None:
+                if not valid(probe, dx=dx):
+                    continue
+                probe.x += dx
+            elif not probe.rotate(rot, board) or probe.shape_key == "O":
+                continue
+            nxt = (probe.r, probe.x, probe.y)
+            if nxt not in parent:
+                parent[nxt] = (state, action)
+                queue.append(nxt)
+
+        # 降到底（sonic drop）：這個狀態直接 HARD_DROP 的落點
+        dist = min(tops[x + c] - 1 - (y + b) for c, b in bottoms[r])
+        if dist < 0:                       # 卡在懸空結構下方 → 逐格檢查
+            probe.r, probe.x, probe.y = r, x, y
+            while valid(probe, dy=1):
+                probe.y += 1
+            dist = probe.y - y
+        o = ROTATIONS[piece.shape_key][r]
+        key = (y + dist + o.top, x + o.left, o.masks)    # 實際佔用格，與旋轉狀態無關
+        if key not in found:
+            found[key] = ((r, x, y + dist), state)
+        if dist:
+            # 落到底後還可以再移動 / 旋轉（tuck、spin）；只有這些路徑才會展開成軟降
+            nxt = (r, x, y + dist)
+            if nxt not in parent:
+                parent[nxt] = (state, (engine.SOFT_DROP,) * dist)
+                queue.append(nxt)
+
+    result = []
+    for (r, x, y), state in found.values():
+        actions = [engine.HARD_DROP]
+        link = parent[state]
+        while link is not None:
+            state, action = link
+            if isinstance(action, tuple):
+                actions.extend(action)
+            else:
+                actions.append(action)
+            link = parent[state]
+        actions.reverse()
+        result.append(Placement(piece.shape_key, r, x, y, tuple(actions)))
+    return result
+
+
+# ---------- 模擬鎖入 ----------
+def place_rows(rows: Sequence[int], p: Placement) -> Tuple[Optional[List[int]], int]:
+    """回傳 (鎖入並消行後的 rows, 消行數)；超出頂端 (game over) 時 rows 為 None。"""
+    new, cleared, _ = _place(rows, None, p)
+    return new, cleared
+
+
+def _place(rows, columns, p):
+    """place_rows 加上欄高 / 洞數：columns = (heights, holes) 時回傳更新後的複本（與 Board 相同的增量算法）。"""
+    o = ROTATIONS[p.shape][p.r]
+    if p.y + o.top < 0:
+        return None, 0, None
+    new = list(rows)
+    shift = p.x + o.left
+    for ry, mask in o.masks:
+        new[p.y + ry] |= mask << shift
+    if columns is not None:
+        heights, holes = list(columns[0]), list(columns[1])
+        lock_columns(heights, holes, p.shape, p.r, p.x, p.y)
+        columns = (heights, holes)
+    if FULL_ROW not in new:
+        return new, 0, columns
+    full = [y for y, m in enumerate(new) if m == FULL_ROW]
+    kept = [m for m in new if m != FULL_ROW]
+    cleared = len(full)
+    new = [0] * cleared + kept
+    if columns is not None:
+        clear_columns(columns[0], columns[1], new, full[0], cleared)
+    return new, cleared, columns
+
+
+# ---------- 盤面特徵 ----------
+def _features(heights: Sequence[int], holes: Sequence[int]) -> Dict[str, int]:
+    aggregate_height, total_holes, bumpiness, wells = summarize(heights, holes)
+    return {
+        "aggregate_height": aggregate_height,
+        "holes": total_holes,
+        "bumpiness": bumpiness,
+        "wells": wells,
+    }
+
+
+def features(rows: Sequence[int]) -> Dict[str, int]:
+    """由 rows 計算 aggregate_height / holes / bumpiness / wells。"""
+    return _features(*column_stats(rows))
+
+
+def _weighted(feats: Dict[str, int], weights: Dict[str, float]) -> float:
+    score = 0.0
+    for name, value in feats.items():
+        score += value * weights.get(name, 0.0)
+    return score
+
+
+def board_score(rows: Sequence[int], weights: Dict[str, float] = DEFAULT_WEIGHTS) -> float:
+    """盤面特徵的加權分數（不含消行）。"""
+    return _weighted(features(rows), weights)
+
+
+def evaluate(rows: Sequence[int], lines: int, weights: Dict[str, float] = DEFAULT_WEIGHTS) -> float:
+    return board_score(rows, weights) + lines * weights.get("lines", 0.0)
+
+
+# ---------- 置換表 ----------
+class TranspositionTable:
+    """搜尋用置換表：盤面評分、落點列舉與搜尋結果各一個 LRU 快取。
+
+    盤面以 rows（Board.grid 的佔用 bitmask）當 key，搜尋結果另外加上
+    current / previews / hold 方塊與搜尋參數；不同移動順序走到的同一盤面只評分一次。
+    """
+
+    def __init__(self, maxsize: int = 200_000, weights: Dict[str, float] = DEFAULT_WEIGHTS):
+        self.evals = LRUCache(maxsize)
+        self.searches = LRUCache(max(1, maxsize // 8))
+        self.moves = LRUCache(max(1, maxsize // 8))
+        self.weights = dict(weights)
+
+    def sync(self, weights: Dict[str, float]):
+        """權重改變時舊分數全部失效。"""
+        if weights != self.weights:
+            self.clear()
+            self.weights = dict(weights)
+
+    def board_score(self, rows: Sequence[int], columns=None) -> float:
+        """columns = (heights, holes) 已知時不必重新掃描 rows。"""
+        key = tuple(rows)
+        score = self.evals.get(key)
+        if score is None:
+            feats = features(rows) if columns is None else _features(*columns)
+            score = _weighted(feats, self.weights)
+            self.evals.put(key, score)
+        return score
+
+    def placements(self, rows: Sequence[int], piece: Tetromino) -> List[Placement]:
+        key = (tuple(rows), piece.shape_key, piece.r, piece.x, piece.y)
+        found = self.moves.get(key)
+        if found is None:
+            found = placements(_Rows(rows), piece)
+            self.moves.put(key, found)
+        return found
+
+    def clear(self):
+        self.evals.clear()
+        self.searches.clear()
+        self.moves.clear()
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return {"evals": self.evals.stats(), "searches": self.searches.stats(),
+                "moves": self.moves.stats()}
+
+
+# ---------- 搜尋 ----------
+def _spawned(piece: Tetromino, r: int = 0) -> Tetromino:
+    p = Tetromino(piece.shape_key)
+    p.r = r
+    p.x = BOARD_COLS // 2 - len(p.matrix[0]) // 2
+    p.y = -2
+    return p
+
+
+def _options(piece, previews, hold, can_hold):
+    """(是否 HOLD, 要放的方塊, 之後的 previews, 之後的 hold)"""
+    yield False, piece, previews, hold
+    if not can_hold:
+        return
+    if hold is not None:
+        # 與 GameState.hold 相同：換出來的方塊保留原本的旋轉狀態
+        yield True, _spawned(hold, hold.r), previews, piece
+    elif previews:
+        yield True, _spawned(previews[0]), previews[1:], piece
+
+
+def _search(rows, columns, piece, previews, hold, can_hold, depth, beam, weights, table):
+    """回傳 [(分數, 是否 HOLD, Placement)]，已由高到低排序；分數只計本層以後的消行。
+
+    columns = (各欄高度, 各欄洞數)，隨每個落點增量更新，評分時不必整盤掃描。
+    """
+    key = None
+    if table is not None:
+        key = (tuple(rows), piece.shape_key, piece.r, piece.x, piece.y,
+               tuple(p.shape_key for p in previews),
+               hold and (hold.shape_key, hold.r), can_hold, depth, beam)
+        cached = table.searches.get(key)
+        if cached is not None:
+            return cached
+
+    # 往後看的層數不能超過每個選項都還有 preview 可用的深度，否則不同深度的分數會混在一起比較
+    shortest = len(previews) - (1 if can_hold and hold is None and previews else 0)
+    depth = min(depth, 1 + shortest)
+
+    line_weight = weights.get("lines", 0.0)
+    scored = []
+    for use_hold, p, rest, next_hold in _options(piece, previews, hold, can_hold):
+        found = table.placements(rows, p) if table is not None else placements(_Rows(rows), p)
+        for pl in found:
+            new, cleared, cols = _place(rows, columns, pl)
+            if new is None:
+                continue
+            if table is not None:
+                base = table.board_score(new, cols)
+            else:
+                base = _weighted(_features(*cols), weights)
+            scored.append((base + cleared * line_weight, use_hold, pl, new, cols, cleared, rest, next_hold))
+    scored.sort(key=lambda t: t[0], reverse=True)
+
+    if depth > 1 and scored:
+        result = []
+        for score, use_hold, pl, new, cols, cleared, rest, next_hold in scored[:beam]:
+            nxt = _spawned(rest[0])
+            sub = _search(new, cols, nxt, rest[1:], next_hold, True, depth - 1, beam, weights, table)
+            # 之後每個落點都會 game over → 死路，排在所有安全的落點之後
+            score = cleared * line_weight + sub[0][0] if sub else float("-inf")
+            result.append((score, use_hold, pl))
+        result.sort(key=lambda t: t[0], reverse=True)
+    else:
+        result = [(score, use_hold, pl) for score, use_hold, pl, *_ in scored]
+
+    if key is not None:
+        table.searches.put(key, result)
+    return result
+
+
+def best_move(board, piece: Tetromino, previews: Sequence[Tetromino] = (),
+              hold: Optional[Tetromino] = None, can_hold: bool = True,
+              depth: int = 2, beam: int = 4,
+              weights: Dict[str, float] = DEFAULT_WEIGHTS,
+              table: Optional[TranspositionTable] = None) -> Optional[Move]:
+    """為目前方塊選出最佳落點。
+
+    previews 為之後依序出現的方塊（至少含 next_piece）；depth 為往後看幾顆方塊
+    （1 = 只看目前方塊），每層只展開評分最高的 beam 個落點。傳入 table
+    時跨呼叫重用盤面評分與搜尋結果。
+    """
+    if table is not None:
+        table.sync(weights)
+    if isinstance(board, Board):
+        stats = board.stats()
+        columns = (stats.heights, stats.column_holes)
+    else:
+        columns = column_stats(board.rows)
+    ranked = _search(list(board.rows), columns, piece, list(previews), hold, can_hold, depth, beam, weights, table)
+    if not ranked:
+        return None
+    score, use_hold, pl = ranked[0]
+    actions = ((engine.HOLD,) if use_hold else ()) + pl.actions
+    return Move(pl, use_hold, score, actions)
+
+
+def state_move(state: "engine.GameState", **kwargs) -> Optional[Move]:
+    """對 GameState 目前局面呼叫 best_move。"""
+    return best_move(state.board, state.current, state.previews, state.hold_piece,
+                     not state.hold_locked, **kwargs)
+
+
+__all__ = [
+    "DEFAULT_WEIGHTS",
+    "Placement",
+    "Move",
+    "placements",
+    "place_rows",
+    "features",
+    "board_score",
+    "evaluate",
+    "TranspositionTable",
+    "best_move",
+    "state_move",
+]
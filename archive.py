@@ -0,0 +1,272 @@
+"""多局對局封存檔：一個檔案存放大量對局（seed＋每顆方塊的落點與輸入），
+以 mmap 開啟並透過索引隨機存取，分析工具可逐局串流而不必整檔載入記憶體。
+
+檔案結構::
+
+    標頭            magic | version | 對局數 | 索引位置
+    對局資料 ...
+    索引            每局一筆固定長度紀錄：位置, 長度, seed, 分數, 方塊數
+
+對局資料：seed、難度、方塊產生方式、落點數，接著每個落點
+u16(shape | r | hold | x | y) + varint(輸入數)，最後是所有輸入的 4-bit 代碼。
+"""
+import mmap
+import os
+import struct
+from typing import Iterator, List, NamedTuple, Tuple
+
+import engine
+from board import Board
+from replay import read_str, read_varint, unzigzag, write_str, write_varint, zigzag
+from tetromino import SHAPE_KEYS, PieceGenerator, Tetromino
+
+MAGIC = b"TRAR"
+VERSION = 1
+EXTENSION = ".tra"
+
+_HEADER = struct.Struct("<4sHxxQQ4x")         # magic, version, count, index_offset
+_ENTRY = struct.Struct("<QIqqI")               # offset, length, seed, score, pieces
+
+_ACTION_CODES = {a: i for i, a in enumerate(engine.ACTIONS)}
+_X_BIAS, _Y_BIAS = 4, 8                        # 落點座標可能為負，存之前先平移
+
+
+class Placement(NamedTuple):
+    """一顆方塊的落點（鎖入前的位置）與放置它所用的輸入。"""
+
+    game: int
+    index: int
+    shape: str
+    r: int
+    x: int
+    y: int
+    held: bool
+    inputs: Tuple[str, ...]
+
+
+class GameEntry(NamedTuple):
+    """索引中的一筆；不需解碼對局資料即可篩選。"""
+
+    offset: int
+    length: int
+    seed: int
+    score: int
+    pieces: int
+
+
+# ---------- 記錄 ----------
+class GameLog:
+    """掛在 GameState.recorder 上，記錄每顆方塊的落點與輸入。"""
+
+    def __init__(self, state):
+        self.seed = state.seed
+        self.difficulty = state.difficulty
+        self.randomizer = state.randomizer
+        self.placements = []              # (shape, r, x, y, held, inputs)
+        self._inputs = []
+        state.recorder = self
+
+    def record(self, state, action):
+        self._inputs.append(action)
+
+    def placed(self, state, piece, cleared):
+        self.placements.append((piece.shape_key, piece.r, piece.x, piece.y,
+                                state.hold_locked, tuple(self._inputs)))
+        self._inputs = []
+
+    def finish(self, state):
+        """回傳 (payload, seed, score, pieces)，可直接交給 ArchiveWriter.add()。"""
+        state.recorder = None
+        return encode_game(self.seed, self.difficulty, self.randomizer, self.placements), \
+            self.seed, state.score, len(self.placements)
+
+
+def encode_game(seed, difficulty, randomizer, placements) -> bytes:
+    out = bytearray()
+    write_varint(out, zigzag(int(seed)))
+    write_str(out, difficulty)
+    write_str(out, randomizer)
+    write_varint(out, len(placements))
+    codes = []
+    for shape, r, x, y, held, inputs in placements:
+        packed = (SHAPE_KEYS.index(shape) | r << 3 | held << 5
+                  | (x + _X_BIAS) << 6 | (y + _Y_BIAS) << 10)
+        out += packed.to_bytes(2, "little")
+        write_varint(out, len(inputs))
+        codes += (_ACTION_CODES[a] for a in inputs)
+    if len(codes) % 2:
+        codes.append(0)
+    out += bytes(codes[i] | codes[i + 1] << 4 for i in range(0, len(codes), 2))
+    return bytes(out)
+
+
+def _decode_game(data, pos):
+    """從 data[pos:] 解碼一局，回傳 (seed, 難度, 方塊產生方式, 落點, 結束位置)。
+    落點為 (shape, r, x, y, held, inputs)；資料不完整時拋出 IndexError。"""
+    seed, pos = read_varint(data, pos)
+    difficulty, pos = read_str(data, pos)
+    randomizer, pos = read_str(data, pos)
+    n, pos = read_varint(data, pos)
+    spots, total = [], 0
+    for _ in range(n):
+        packed = data[pos] | data[pos + 1] << 8
+        count, pos = read_varint(data, pos + 2)
+        spots.append((packed, count))
+        total += count
+    end = pos + (total + 1) // 2
+    if end > len(data):
+        raise IndexError("truncated game data")
+    codes = bytes(data[pos:end])
+    placements, nibble = [], 0
+    for packed, count in spots:
+        inputs = []
+        for _ in range(count):
+            byte = codes[nibble >> 1]
+            inputs.append(engine.ACTIONS[byte >> 4 if nibble & 1 else byte & 0x0F])
+            nibble += 1
+        placements.append((SHAPE_KEYS[packed & 7], packed >> 3 & 3,
+                           (packed >> 6 & 0x0F) - _X_BIAS, (packed >> 10) - _Y_BIAS,
+                           bool(packed >> 5 & 1), tuple(inputs)))
+    return unzigzag(seed), difficulty, randomizer, placements, end
+
+
+# ---------- 寫入 ----------
+class ArchiveWriter:
+    """逐局附加寫入；close() 時寫入索引。append=True 時接續既有檔案。
+
+    既有檔案沒有索引（上次寫入沒跑到 close()）時，掃描對局資料重建索引，
+    並捨棄最後一局寫到一半的資料。每局 add() 後即 flush，標頭的索引只在 close() 時寫入。
+    """
+
+    def __init__(self, path, append=False):
+        self.entries: List[Tuple[int, int, int, int, int]] = []
+        if append and os.path.exists(path) and os.path.getsize(path) >= _HEADER.size:
+            with ArchiveReader(path) as old:
+                if old.index_offset:
+                    self.entries = [tuple(e) for e in old.entries()]
+                    end = old.index_offset
+                else:
+                    self.entries, end = old.recover()
+            self.f = open(path, "r+b")
+            self.f.truncate(max(end, _HEADER.size))     # 不可切到標頭裡
+            # 舊索引已被切掉：先把標頭改回「沒有索引」，寫到一半當掉時下次一律走 recover()
+            self.f.write(_HEADER.pack(MAGIC, VERSION, 0, 0))
+            self.f.flush()
+            self.f.seek(0, os.SEEK_END)
+        else:
+            self.f = open(path, "wb")
+            self.f.write(_HEADER.pack(MAGIC, VERSION, 0, 0))
+
+    def add(self, payload, seed, score, pieces):
+        offset = self.f.tell()
+        self.f.write(payload)
+        self.f.flush()                     # 呼叫端（bench --resume）以為已存下的對局必須真的在檔案裡
+        self.entries.append((offset, len(payload), int(seed), int(score), int(pieces)))
+
+    def close(self):
+        if self.f.closed:
+            return
+        index_offset = self.f.tell()
+        for entry in self.entries:
+            self.f.write(_ENTRY.pack(*entry))
+        self.f.seek(0)
+        self.f.write(_HEADER.pack(MAGIC, VERSION, len(self.entries), index_offset))
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ---------- 讀取 ----------
+class ArchiveReader:
+    """以 mmap 開啟封存檔；索引與對局資料都只在存取時才解碼。"""
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.data = memoryview(self._mm)
+        magic, version, self.count, self.index_offset = _HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC:
+            raise ValueError("not a game archive")
+        if version != VERSION:
+            raise ValueError(f"unsupported archive version {version}")
+
+    def __len__(self):
+        return self.count
+
+    def entry(self, i) -> GameEntry:
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        return GameEntry(*_ENTRY.unpack_from(self.data, self.index_offset + i * _ENTRY.size))
+
+    def entries(self) -> Iterator[GameEntry]:
+        for i in range(self.count):
+            yield GameEntry(*_ENTRY.unpack_from(self.data, self.index_offset + i * _ENTRY.size))
+
+    def recover(self):
+        """沒有索引時從頭掃描對局資料，回傳 (索引紀錄, 最後一局完整資料的結束位置)。
+
+        分數不在對局資料裡，以輸入重新模擬求得（與 bench.play_game 相同，只用 step()）。
+        """
+        entries, pos = [], _HEADER.size
+        while pos < len(self.data):
+            try:
+                seed, difficulty, randomizer, spots, end = _decode_game(self.data, pos)
+                state = engine.GameState(difficulty=difficulty, seed=seed, randomizer=randomizer)
+            except (IndexError, KeyError, ValueError):    # 寫到一半的最後一局
+                break
+            for spot in spots:
+                for action in spot[-1]:
+                    state.step(action)
+            entries.append((pos, end - pos, seed, state.score, len(spots)))
+            pos = end
+        return entries, pos
+
+    # ---------- 單局 ----------
+    def _game(self, i):
+        """第 i 局的 (seed, 難度, 方塊產生方式, 落點)；從 mmap 複製出來解碼，不留下 view。"""
+        e = self.entry(i)
+        return _decode_game(self.data, e.offset)[:4]
+
+    def placements(self, i) -> Iterator[Placement]:
+        for k, spot in enumerate(self._game(i)[3]):
+            yield Placement(i, k, *spot)
+
+    def boards(self, i) -> Iterator[Tuple[Placement, Board]]:
+        """逐顆產生 (落點, 放置前的盤面)；盤面物件會被重複使用，需要保留請自行複製。"""
+        board = Board()
+        piece_by_shape = {k: Tetromino(k) for k in SHAPE_KEYS}
+        for p in self.placements(i):
+            yield p, board
+            piece = piece_by_shape[p.shape]
+            piece.r, piece.x, piece.y = p.r, p.x, p.y
+            board.lock_piece(piece)
+
+    def seed_sequence(self, i, n) -> List[str]:
+        """依 seed 重建前 n 顆方塊（驗證用）。"""
+        seed, _, randomizer, _ = self._game(i)
+        gen = PieceGenerator(seed, randomizer)
+        return [gen.next().shape_key for _ in range(n)]
+
+    # ---------- 全部 ----------
+    def iter_placements(self) -> Iterator[Placement]:
+        for i in range(self.count):
+            yield from self.placements(i)
+
+    def iter_boards(self) -> Iterator[Tuple[Placement, Board]]:
+        for i in range(self.count):
+            yield from self.boards(i)
+
+    def close(self):
+        self.data.release()
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
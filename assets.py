@@ -0,0 +1,107 @@
+"""圖片 / 音效的磁碟快取：第一次啟動時解碼（並縮放）後把原始像素 / PCM 寫進
+ASSET_CACHE_DIR，之後的啟動直接讀回 raw buffer，不必再解碼 PNG / JPG / MP3。
+
+快取鍵 = 來源檔內容的雜湊 + 變體參數（縮放尺寸、mixer 格式），來源檔或
+CELL_SIZE / 螢幕尺寸改變時自然會換一個鍵，不需要手動清除。
+背景音樂由 pygame.mixer.music 串流播放，不經過這裡。
+"""
+import hashlib
+import os
+import struct
+
+import pygame
+
+import settings as cfg
+
+FORMAT_VERSION = 1
+IMAGE_MAGIC = b"TIMG"
+SOUND_MAGIC = b"TSND"
+_IMAGE_HEADER = struct.Struct("<4sHHB")      # magic, 寬, 高, 是否有 alpha
+
+_digests = {}                                # 路徑 → (mtime, size, 雜湊)，同一次執行內不重算
+
+
+def file_digest(path):
+    st = os.stat(path)
+    cached = _digests.get(path)
+    if cached and cached[:2] == (st.st_mtime_ns, st.st_size):
+        return cached[2]
+    with open(path, "rb") as f:
+        digest = hashlib.sha1(f.read()).hexdigest()
+    _digests[path] = (st.st_mtime_ns, st.st_size, digest)
+    return digest
+
+
+def cache_path(path, *variant):
+    key = repr((FORMAT_VERSION, file_digest(path), variant)).encode()
+    return os.path.join(cfg.ASSET_CACHE_DIR, hashlib.sha1(key).hexdigest() + ".bin")
+
+
+def _read(path):
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _write(path, data):
+    """寫到暫存檔再 rename，其他程序不會讀到寫一半的檔案；唯讀環境就放棄快取。"""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def _display_format(surf, alpha):
+    if pygame.display.get_surface() is None:   # 還沒開視窗時無法轉成顯示格式
+        return surf
+    return surf.convert_alpha() if alpha else surf.convert()
+
+
+# ---------- 圖片 ----------
+def load_image(path, size=None, alpha=True):
+    """讀取圖片（可選擇縮放成 size），回傳顯示格式的 Surface。"""
+    if not cfg.ASSET_CACHE:
+        return _decode_image(path, size, alpha)[0]
+
+    cpath = cache_path(path, tuple(size) if size else None, alpha)
+    data = _read(cpath)
+    if data and data[:4] == IMAGE_MAGIC:
+        _, w, h, has_alpha = _IMAGE_HEADER.unpack_from(data)
+        mode = "RGBA" if has_alpha else "RGB"
+        surf = pygame.image.frombuffer(data[_IMAGE_HEADER.size:], (w, h), mode)
+        return _display_format(surf, alpha)
+
+    surf, raw = _decode_image(path, size, alpha)
+    w, h = surf.get_size()
+    _write(cpath, _IMAGE_HEADER.pack(IMAGE_MAGIC, w, h, alpha) + raw)
+    return surf
+
+
+def _decode_image(path, size, alpha):
+    surf = pygame.image.load(path)
+    if size:
+        surf = pygame.transform.scale(surf, size)
+    raw = pygame.image.tobytes(surf, "RGBA" if alpha else "RGB")
+    return _display_format(surf, alpha), raw
+
+
+# ---------- 音效 ----------
+def load_sound(path):
+    """讀取音效；快取內容是依目前 mixer 格式解碼好的 PCM。"""
+    if not cfg.ASSET_CACHE:
+        return pygame.mixer.Sound(path)
+
+    cpath = cache_path(path, pygame.mixer.get_init())
+    data = _read(cpath)
+    if data and data[:4] == SOUND_MAGIC:
+        return pygame.mixer.Sound(buffer=data[4:])
+
+    sound = pygame.mixer.Sound(path)
+    _write(cpath, SOUND_MAGIC + sound.get_raw())
+    return sound
@@ -0,0 +1,291 @@
+"""NumPy 批次模擬：N 個盤面存成一個陣列，每種動作對所有盤面一次向量化執行。
+
+規則與 Board.valid_position / lock_piece / clear_lines、Tetromino.rotate 的 SRS kick
+（JLSTZ_KICKS / I_KICKS）與 GameState.update_score 相同；不含重力計時（以動作為單位推進）。
+方塊產生方式同 PieceGenerator（預設 settings.RANDOMIZER）：分布相同，但同一個 seed
+不會得到與 GameState 相同的序列。
+"""
+import numpy as np
+
+import settings as cfg
+from settings import BOARD_COLS, BOARD_ROWS
+from tetromino import KICKS, ROTATIONS, SHAPE_KEYS, PieceGenerator
+import engine
+
+FULL_ROW = (1 << BOARD_COLS) - 1
+
+# --------- 動作代碼（與 engine.ACTIONS 的索引一致）---------
+NOOP       = -1
+LEFT       = engine.ACTIONS.index(engine.LEFT)
+RIGHT      = engine.ACTIONS.index(engine.RIGHT)
+ROTATE     = engine.ACTIONS.index(engine.ROTATE)
+ROTATE_CCW = engine.ACTIONS.index(engine.ROTATE_CCW)
+SOFT_DROP  = engine.ACTIONS.index(engine.SOFT_DROP)
+HARD_DROP  = engine.ACTIONS.index(engine.HARD_DROP)
+HOLD       = engine.ACTIONS.index(engine.HOLD)
+
+O_SHAPE = SHAPE_KEYS.index("O")
+T_SHAPE = SHAPE_KEYS.index("T")
+SPAWN_X, SPAWN_Y = BOARD_COLS // 2 - 2, -2
+
+
+# ---------- 由 ROTATIONS 建立查表 ----------
+def _build_tables():
+    n = len(SHAPE_KEYS)
+    left   = np.zeros((n, 4), np.int16)
+    right  = np.zeros((n, 4), np.int16)
+    top    = np.zeros((n, 4), np.int16)
+    bottom = np.zeros((n, 4), np.int16)
+    masks  = np.zeros((n, 4, 4), np.int32)       # [shape, r, 矩陣列]，bit 0 = 第 left 欄
+    cells  = np.zeros((n, 4, 4, 2), np.int16)    # [shape, r, 格, (col,row)]
+    kicks  = np.zeros((n, 4, 2, 5, 2), np.int16) # [shape, 舊 r, 0=CW/1=CCW, 第幾組, (dx,dy)]
+    for s, key in enumerate(SHAPE_KEYS):
+        for r, o in enumerate(ROTATIONS[key]):
+            left[s, r], right[s, r], top[s, r], bottom[s, r] = o.left, o.right, o.top, o.bottom
+            for row, bits in o.masks:
+                masks[s, r, row] = bits
+            cells[s, r] = o.cells
+            for d, step in enumerate((1, -1)):
+                kicks[s, r, d] = KICKS[key][(r, (r + step) % 4)]
+    colors = np.array([ROTATIONS[k][0].color for k in SHAPE_KEYS], np.uint8)
+    return left, right, top, bottom, masks, cells, kicks, colors
+
+LEFT_T, RIGHT_T, TOP_T, BOTTOM_T, MASKS_T, CELLS_T, KICKS_T, COLORS_T = _build_tables()
+POINTS_T = np.array([0, 1, 3, 5, 8], np.int64)      # 一般消行（乘上 level+1）
+
+
+class BatchSim:
+    """N 個盤面的批次模擬；所有狀態都是長度 N 的陣列。"""
+
+    def __init__(self, n, seed=None, randomizer=None):
+        self.n = n
+        self.randomizer = randomizer or cfg.RANDOMIZER
+        if self.randomizer not in PieceGenerator.MODES:
+            raise ValueError(f"unknown randomizer mode: {self.randomizer!r}")
+        self.rng = np.random.default_rng(seed)
+        self._idx = np.arange(n)
+        self.reset()
+
+    # ---------- 開啟新局 ----------
+    def reset(self, which=None):
+        """重置全部（或 which 為 True 的）盤面。"""
+        n = self.n
+        if which is None:
+            self.rows   = np.zeros((n, BOARD_ROWS), np.int32)           # 佔用 bitmask
+            self.colors = np.zeros((n, BOARD_ROWS, BOARD_COLS), np.uint8)
+            self.shape  = np.zeros(n, np.int8)
+            self.rot    = np.zeros(n, np.int8)
+            self.x      = np.zeros(n, np.int16)
+            self.y      = np.zeros(n, np.int16)
+            self.rotated = np.zeros(n, bool)
+            self.bag     = np.zeros((n, len(SHAPE_KEYS)), np.int8)   # 各盤面目前這一袋（bag 模式）
+            self.bag_pos = np.full(n, len(SHAPE_KEYS), np.int8)      # 下一顆在袋中的位置；發完 = 7
+            self.next_shape  = self._draw(np.ones(n, bool))
+            self.hold_shape  = np.full(n, -1, np.int8)
+            self.hold_rot    = np.zeros(n, np.int8)
+            self.hold_locked = np.zeros(n, bool)
+            self.score  = np.zeros(n, np.int64)
+            self.lines  = np.zeros(n, np.int64)
+            self.level  = np.zeros(n, np.int64)
+            self.b2b    = np.zeros(n, bool)
+            self.pieces = np.zeros(n, np.int64)
+            self.over   = np.zeros(n, bool)
+            self.spawn()
+            return
+        which = np.asarray(which, bool)
+        self.rows[which] = 0
+        self.colors[which] = 0
+        self.hold_shape[which] = -1
+        for arr in (self.score, self.lines, self.level, self.pieces):
+            arr[which] = 0
+        self.b2b[which] = False
+        self.over[which] = False
+        self.bag_pos[which] = len(SHAPE_KEYS)      # 新局從新的一袋開始（同 GameState 重建 PieceGenerator）
+        self.next_shape[which] = self._draw(which)
+        self.spawn(which)
+
+    # ---------- 檢查合法位置 ----------
+    def valid(self, dx=0, dy=0, rot=None):
+        """對應 Board.valid_position；dx/dy/rot 可為純量或長度 N 的陣列。"""
+        s = self.shape
+        r = self.rot if rot is None else rot
+        x = self.x + dx
+        y = self.y + dy
+        ok = (x + LEFT_T[s, r] >= 0) & (x + RIGHT_T[s, r] < BOARD_COLS) & (y + BOTTOM_T[s, r] < BOARD_ROWS)
+        shift = np.clip(x + LEFT_T[s, r], 0, BOARD_COLS)
+        masks = MASKS_T[s, r]
+        for k in range(4):
+            row = y + k
+            inside = (row >= 0) & (row < BOARD_ROWS)
+            cells = self.rows[self._idx, np.clip(row, 0, BOARD_ROWS - 1)]
+            ok &= ~(inside & ((cells & (masks[:, k] << shift)) != 0))
+        return ok
+
+    # ---------- 移動 / 旋轉 ----------
+    def move(self, dx, active=True):
+        moved = active & ~self.over & self.valid(dx=dx)
+        self.x += np.where(moved, dx, 0).astype(np.int16)
+        self.rotated &= ~moved
+        return moved
+
+    def rotate(self, direction, active=True):
+        """direction：+1 = CW、-1 = CCW（純量或陣列），依序測試 5 組 kick。"""
+        direction = np.broadcast_to(direction, (self.n,))
+        active = np.broadcast_to(active, (self.n,)) & ~self.over
+        is_o = self.shape == O_SHAPE
+        done = active & is_o                     # O 不旋轉但視為成功
+        pending = active & ~is_o
+        d = np.where(direction == 1, 0, 1)
+        new_r = ((self.rot + np.where(d == 0, 1, -1)) % 4).astype(np.int8)
+        kicks = KICKS_T[self.shape, self.rot, d]  # (N, 5, 2)
+        for k in range(5):
+            if not pending.any():
+                break
+            kx, ky = kicks[:, k, 0], kicks[:, k, 1]
+            hit = pending & self.valid(kx, ky, new_r)
+            self.x += np.where(hit, kx, 0).astype(np.int16)
+            self.y += np.where(hit, ky, 0).astype(np.int16)
+            self.rot = np.where(hit, new_r, self.rot).astype(np.int8)
+            self.rotated |= hit
+            done |= hit
+            pending &= ~hit
+        self.rotated |= active & is_o
+        return done
+
+    def soft_drop(self, active=True):
+        moved = active & ~self.over & self.valid(dy=1)
+        self.y += moved.astype(np.int16)
+        self.rotated &= ~moved
+        return moved
+
+    def hard_drop(self, active=True):
+        """落到底並鎖定；回傳每個盤面的消行數（-1 = game over，未參與為 0）。"""
+        falling = np.broadcast_to(active, (self.n,)) & ~self.over
+        locking = falling.copy()
+        while falling.any():
+            falling &= self.valid(dy=1)
+            self.y += falling.astype(np.int16)
+            self.rotated &= ~falling
+        return self.lock(locking)
+
+    # ---------- 固定方塊＋消行 ----------
+    def lock(self, active=True):
+        active = np.broadcast_to(active, (self.n,)) & ~self.over
+        result = np.zeros(self.n, np.int64)
+        dead = active & (self.y + TOP_T[self.shape, self.rot] < 0)
+        ok = active & ~dead
+        b = np.nonzero(ok)[0]
+        if len(b):
+            s, r = self.shape[b], self.rot[b]
+            shift = (self.x[b] + LEFT_T[s, r]).astype(np.int32)
+            masks = MASKS_T[s, r]
+            for k in range(4):
+                row = self.y[b] + k
+                m = masks[:, k]
+                hit = m != 0
+                self.rows[b[hit], row[hit]] |= m[hit] << shift[hit]
+            cells = CELLS_T[s, r]                               # (B, 4, 2)
+            cx = self.x[b, None] + cells[:, :, 0]
+            cy = self.y[b, None] + cells[:, :, 1]
+            self.colors[b[:, None], cy, cx] = COLORS_T[s][:, None]
+            cleared = self.clear_lines(ok)
+            result[b] = cleared[b]
+            self._update_score(ok, cleared)
+            self.pieces += ok
+            self.spawn(ok)
+        result[dead] = -1
+        self.over |= dead
+        return result
+
+    def clear_lines(self, active=True):
+        active = np.broadcast_to(active, (self.n,))
+        full = (self.rows == FULL_ROW) & active[:, None]
+        counts = full.sum(axis=1)
+        b = np.nonzero(counts)[0]
+        if len(b):
+            # 穩定排序：滿列移到最上方再清空，其餘列維持原順序往下靠
+            order = np.argsort(~full[b], axis=1, kind="stable")
+            rows = np.take_along_axis(self.rows[b], order, axis=1)
+            colors = np.take_along_axis(self.colors[b], order[:, :, None], axis=1)
+            empty = np.arange(BOARD_ROWS)[None, :] < counts[b, None]
+            rows[empty] = 0
+            colors[empty] = 0
+            self.rows[b] = rows
+            self.colors[b] = colors
+        return counts
+
+    # ---------- 計分（同 GameState.update_score）----------
+    def _update_score(self, active, cleared):
+        tspin = active & (self.shape == T_SHAPE) & self.rotated & (cleared > 0)
+        level_mul = self.level + 1
+        points = POINTS_T[cleared] * level_mul
+        points = np.where(tspin & (cleared == 2), 12 * level_mul, points)
+        points = np.where(tspin & (cleared == 3), 36 * level_mul, points)
+        difficult = (cleared == 4) | (tspin & ((cleared == 2) | (cleared == 3)))
+        points = np.where(difficult & self.b2b, (points * 3) // 2, points)
+        scoring = active & (cleared > 0)
+        self.score += np.where(scoring, points, 0)
+        self.b2b = np.where(active, difficult & scoring, self.b2b)
+        self.lines += np.where(scoring, cleared, 0)
+        self.level += scoring & (self.lines // 10 > self.level)
+
+    # ---------- 產生新方塊 / HOLD ----------
+    def spawn(self, active=True):
+        active = np.broadcast_to(active, (self.n,))
+        k = int(active.sum())
+        if not k:
+            return
+        self.shape[active] = self.next_shape[active]
+        self.rot[active] = 0
+        self.next_shape[active] = self._draw(active)
+        self._place_at_spawn(active)
+        self.hold_locked[active] = False
+        self.over |= active & ~self.valid()
+
+    def _draw(self, active):
+        """active 為 True 的盤面各發一顆，回傳這些盤面的 shape 索引。
+
+        "bag"：每個盤面各有一袋 7 種方塊的隨機排列，依序發完再整袋重洗；"random"：各自均勻抽取。
+        """
+        k = int(active.sum())
+        if self.randomizer == "random":
+            return self.rng.integers(0, len(SHAPE_KEYS), k).astype(np.int8)
+        empty = active & (self.bag_pos >= len(SHAPE_KEYS))
+        m = int(empty.sum())
+        if m:
+            fresh = np.broadcast_to(np.arange(len(SHAPE_KEYS), dtype=np.int8), (m, len(SHAPE_KEYS)))
+            self.bag[empty] = self.rng.permuted(fresh, axis=1)
+            self.bag_pos[empty] = 0
+        b = np.nonzero(active)[0]
+        shapes = self.bag[b, self.bag_pos[b]]
+        self.bag_pos[b] += 1
+        return shapes
+
+    def _place_at_spawn(self, active):
+        self.x[active] = SPAWN_X
+        self.y[active] = SPAWN_Y
+        self.rotated[active] = False
+
+    def hold(self, active=True):
+        active = np.broadcast_to(active, (self.n,)) & ~self.over & ~self.hold_locked
+        empty = active & (self.hold_shape < 0)
+        swap = active & ~empty
+        # 與 GameState.hold 相同：被 HOLD 的方塊保留原本的旋轉狀態
+        held, held_rot = self.shape.copy(), self.rot.copy()
+        self.shape[swap], self.rot[swap] = self.hold_shape[swap], self.hold_rot[swap]
+        self._place_at_spawn(swap)
+        self.hold_shape[active], self.hold_rot[active] = held[active], held_rot[active]
+        self.spawn(empty)
+        self.hold_locked |= active
+        return active
+
+    # ---------- 一次套用每個盤面各自的動作 ----------
+    def step(self, actions):
+        """actions：長度 N 的動作代碼（NOOP/LEFT/.../HOLD）；回傳各盤面消行數。"""
+        actions = np.asarray(actions)
+        self.move(-1, actions == LEFT)
+        self.move(1, actions == RIGHT)
+        self.rotate(np.where(actions == ROTATE_CCW, -1, 1), (actions == ROTATE) | (actions == ROTATE_CCW))
+        self.soft_drop(actions == SOFT_DROP)
+        self.hold(actions == HOLD)
+        return self.hard_drop(actions == HARD_DROP)
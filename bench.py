@@ -0,0 +1,202 @@
+"""Headless 對局批次執行（不需要 pygame）。
+
+    python -m bench tournament --seeds 0:10000 --out results.jsonl
+    python -m bench tournament --seeds 0:10000 --shard 1/4 --resume --weights w.json
+
+每個 seed 一局，由 AI 遊玩，分散到 ProcessPoolExecutor（預設每核心一個 worker），
+每完成一局就寫一行到 JSONL / CSV，可用 --resume 接續、--shard 分片；
+--archive 另外把每局落點與輸入寫進封存檔（見 archive.py）。
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import ai
+import archive
+import engine
+
+FIELDS = ["seed", "score", "lines", "level", "pieces", "tspins", "topped_out", "seconds", "label"]
+
+
+# ---------- 單局 ----------
+def play_game(seed, weights=None, depth=1, beam=4, max_pieces=1000, difficulty="Normal", label="",
+              log=False):
+    """以 AI 玩一局（到 game over 或 max_pieces），回傳統計。
+
+    log=True 時結果另含 "archive"：可交給 archive.ArchiveWriter.add() 的參數。
+    """
+    start = time.perf_counter()
+    state = engine.GameState(difficulty=difficulty, seed=seed)
+    game_log = archive.GameLog(state) if log else None
+    table = ai.TranspositionTable(maxsize=50_000, weights=weights or ai.DEFAULT_WEIGHTS)
+    while not state.over and state.pieces < max_pieces:
+        move = ai.state_move(state, depth=depth, beam=beam,
+                             weights=weights or ai.DEFAULT_WEIGHTS, table=table)
+        if move is None:
+            state.step(engine.HARD_DROP)     # 沒有任何落點 → 直接落下（必定 game over）
+            continue
+        for action in move.actions:
+            state.step(action)
+        state.drain_events()
+    record = {
+        "seed": seed,
+        "score": state.score,
+        "lines": state.lines,
+        "level": state.level,
+        "pieces": state.pieces,
+        "tspins": state.tspins,
+        "topped_out": state.over,
+        "seconds": round(time.perf_counter() - start, 3),
+        "label": label,
+    }
+    if game_log:
+        record["archive"] = game_log.finish(state)
+    return record
+
+
+def _play_game_kwargs(kwargs):
+    return play_game(**kwargs)
+
+
+# ---------- 輸出 ----------
+def _trim_partial_line(path):
+    """中斷時最後一行可能只寫了一半（沒有換行）：截到最後一個完整的行，接續寫入才不會黏在一起。"""
+    with open(path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+
+
+def _done_seeds(path, fmt):
+    """--resume：讀出既有結果檔中已完成的 seed（順便去掉寫到一半的最後一行）。"""
+    if not os.path.exists(path):
+        return set()
+    _trim_partial_line(path)
+    done = set()
+    with open(path, newline="") as f:
+        if fmt == "csv":
+            for row in csv.DictReader(f):
+                done.add(int(row["seed"]))
+        else:
+            for line in f:
+                line = line.strip()
+                if line:
+                    try:
+                        done.add(int(json.loads(line)["seed"]))
+                    except ValueError:
+                        pass
+    return done
+
+
+class _Writer:
+    def __init__(self, path, fmt, append):
+        new = not (append and os.path.exists(path) and os.path.getsize(path))
+        self.f = open(path, "a" if append else "w", newline="")
+        self.fmt = fmt
+        if fmt == "csv":
+            self.csv = csv.DictWriter(self.f, fieldnames=FIELDS)
+            if new:
+                self.csv.writeheader()
+
+    def write(self, record):
+        if self.fmt == "csv":
+            self.csv.writerow(record)
+        else:
+            self.f.write(json.dumps(record) + "\n")
+        self.f.flush()
+
+    def close(self):
+        self.f.close()
+
+
+# ---------- tournament ----------
+def parse_seeds(text):
+    """'100' → 0..99、'100:200' → 100..199"""
+    if ":" in text:
+        lo, hi = text.split(":", 1)
+        return range(int(lo), int(hi))
+    return range(int(text))
+
+
+def parse_shard(text):
+    """'k/n' → (k, n)"""
+    k, n = (int(v) for v in text.split("/", 1))
+    if not 0 <= k < n:
+        raise argparse.ArgumentTypeError(f"shard index must be in 0..{n - 1}")
+    return k, n
+
+
+def tournament(args):
+    weights = None
+    if args.weights:
+        if os.path.exists(args.weights):
+            with open(args.weights) as f:
+                weights = json.load(f)
+        else:
+            weights = json.loads(args.weights)
+
+    fmt = args.format or ("csv" if args.out.endswith(".csv") else "jsonl")
+    k, n = args.shard
+    seeds = [s for s in parse_seeds(args.seeds) if s % n == k]
+    if args.resume:
+        done = _done_seeds(args.out, fmt)
+        seeds = [s for s in seeds if s not in done]
+
+    jobs = [dict(seed=s, weights=weights, depth=args.depth, beam=args.beam,
+                 max_pieces=args.max_pieces, difficulty=args.difficulty, label=args.label,
+                 log=bool(args.archive))
+            for s in seeds]
+    writer = _Writer(args.out, fmt, append=args.resume)
+    games = archive.ArchiveWriter(args.archive, append=args.resume) if args.archive else None
+    total = len(jobs)
+    start = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            futures = [pool.submit(_play_game_kwargs, job) for job in jobs]
+            for i, fut in enumerate(as_completed(futures), 1):
+                record = fut.result()
+                if games:
+                    games.add(*record.pop("archive"))
+                writer.write(record)
+                if not args.quiet:
+                    rate = i / (time.perf_counter() - start)
+                    print(f"\r{i}/{total} games ({rate:.1f}/s)", end="", file=sys.stderr)
+    finally:
+        writer.close()
+        if games:
+            games.close()
+        if not args.quiet:
+            print(file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bench", description="Headless Tetris bot runner")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    t = sub.add_parser("tournament", help="run seeded bot games in parallel")
+    t.add_argument("--seeds", default="1000", help="N (0..N-1) or LO:HI")
+    t.add_argument("--shard", type=parse_shard, default=(0, 1), help="k/n：只跑 seed %% n == k")
+    t.add_argument("--workers", type=int, default=os.cpu_count(), help="worker process 數（預設每核心一個）")
+    t.add_argument("--out", default="results.jsonl")
+    t.add_argument("--format", choices=("jsonl", "csv"), help="預設依副檔名判斷")
+    t.add_argument("--resume", action="store_true", help="略過輸出檔中已完成的 seed 並接續寫入")
+    t.add_argument("--weights", help="AI 權重 JSON 檔或 JSON 字串")
+    t.add_argument("--depth", type=int, default=1)
+    t.add_argument("--beam", type=int, default=4)
+    t.add_argument("--max-pieces", type=int, default=1000)
+    t.add_argument("--difficulty", default="Normal")
+    t.add_argument("--label", default="", help="寫入每筆結果，方便比較不同設定")
+    t.add_argument("--archive", metavar="PATH", help="同時把每局落點與輸入寫進封存檔 (.tra)")
+    t.add_argument("--quiet", action="store_true")
+    t.set_defaults(func=tournament)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
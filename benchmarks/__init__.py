@@ -0,0 +1,10 @@
+"""引擎與繪圖的效能基準。
+
+    python -m benchmarks                          # 全部跑一次，印出表格
+    python -m benchmarks -k valid_position --out results.json
+    python -m benchmarks --save-baseline          # 把結果存成基準
+    python -m benchmarks --compare                # 與基準比較，退步超過 --tolerance 時 exit 1
+
+每個基準先暖身，再重複量測多次取中位數（另列最小 / 最大與離散程度），
+結果以「每秒操作次數」表示，數字越大越好。
+"""
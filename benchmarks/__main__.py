@@ -0,0 +1,53 @@
+import argparse
+import os
+import sys
+
+from . import engine_bench, render_bench  # noqa: F401 — 匯入即登記基準
+from . import runner
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Tetris engine / renderer benchmarks")
+    parser.add_argument("-k", dest="pattern", help="只跑名稱包含此字串的基準")
+    parser.add_argument("--list", action="store_true", help="列出所有基準")
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--min-time", type=float, default=0.2, help="每次量測至少幾秒")
+    parser.add_argument("--out", help="結果寫成 JSON")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="把這次結果存成基準")
+    parser.add_argument("--compare", action="store_true", help="與基準比較")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="比基準慢多少比例算退步")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, (unit, setup) in runner.BENCHMARKS.items():
+            print(f"{name:<34}{unit}/s  {(setup.__doc__ or '').strip()}")
+        return 0
+
+    results = runner.run_all(args.pattern, args.warmup, args.repeat, args.min_time)
+    data = {"meta": runner.metadata(args), "results": results}
+    if args.out:
+        runner.save(args.out, data)
+    if args.save_baseline:
+        runner.save(args.baseline, data)
+        print(f"baseline saved to {args.baseline}", file=sys.stderr)
+
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            print(f"no baseline at {args.baseline} (run with --save-baseline first)", file=sys.stderr)
+            return 2
+        rows = runner.compare(results, runner.load(args.baseline), args.tolerance)
+        print(f"\n{'benchmark':<34}{'current':>14}{'baseline':>14}{'change':>9}")
+        for name, cur, base, ratio, regressed in rows:
+            flag = "  REGRESSION" if regressed else ""
+            print(f"{name:<34}{cur:>14,.0f}{base:>14,.0f}{(ratio - 1) * 100:>+8.1f}%{flag}")
+        if any(row[4] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+"""引擎熱點：碰撞檢查、消行、旋轉（含 kick）、整局模擬。不需要 pygame。"""
+import random
+
+import ai
+import engine
+from board import Board, FULL_ROW
+from settings import BOARD_COLS, BOARD_ROWS
+from tetromino import ROTATIONS, SHAPE_KEYS, Tetromino
+
+from .runner import benchmark
+
+N_CASES = 2000
+
+
+def random_board(rng, height=None, holes=0.25):
+    """底部 height 列隨機填滿（每列至少留一格空，不會有滿列）。"""
+    board = Board()
+    height = rng.randint(4, 14) if height is None else height
+    grid = [[0] * BOARD_COLS for _ in range(BOARD_ROWS)]
+    for y in range(BOARD_ROWS - height, BOARD_ROWS):
+        gap = rng.randrange(BOARD_COLS)
+        for x in range(BOARD_COLS):
+            if x != gap and rng.random() > holes:
+                grid[y][x] = rng.randint(1, 7)
+    board.set_grid(grid)
+    return board
+
+
+def piece_at(shape, r, x, y):
+    piece = Tetromino(shape)
+    piece.r, piece.x, piece.y = r, x, y
+    return piece
+
+
+def random_piece(rng):
+    shape = rng.choice(SHAPE_KEYS)
+    r = rng.randrange(4)
+    o = ROTATIONS[shape][r]
+    x = rng.randint(-o.left, BOARD_COLS - 1 - o.right)
+    y = rng.randint(-o.top, BOARD_ROWS - 1 - o.bottom)
+    return piece_at(shape, r, x, y)
+
+
+# ---------- valid_position ----------
+def _valid_position(cases):
+    def run():
+        for board, piece in cases:
+            board.valid_position(piece)
+    return run, len(cases)
+
+
+@benchmark("board.valid_position.random", "calls")
+def valid_position_random():
+    rng = random.Random(1)
+    boards = [random_board(rng) for _ in range(32)]
+    return _valid_position([(rng.choice(boards), random_piece(rng)) for _ in range(N_CASES)])
+
+
+@benchmark("board.valid_position.worst", "calls")
+def valid_position_worst():
+    """每一列遮罩都要檢查且沒有提早結束：空盤面上、貼底的合法位置。"""
+    rng = random.Random(2)
+    board, cases = Board(), []
+    for _ in range(N_CASES):
+        shape = rng.choice(SHAPE_KEYS)
+        r = rng.randrange(4)
+        o = ROTATIONS[shape][r]
+        x = rng.randint(-o.left, BOARD_COLS - 1 - o.right)
+        cases.append((board, piece_at(shape, r, x, BOARD_ROWS - 1 - o.bottom)))
+    return _valid_position(cases)
+
+
+# ---------- clear_lines ----------
+def _clear_lines(boards):
+    """每次呼叫前把盤面還原（淺複製各個 list 屬性，clear_lines 不會改動原本的列）。"""
+    saved = [(b, {k: v for k, v in vars(b).items() if isinstance(v, list)}) for b in boards]
+
+    def run():
+        for board, lists in saved:
+            for name, value in lists.items():
+                setattr(board, name, value[:])
+            board.clear_lines()
+    return run, len(saved)
+
+
+def _with_full_rows(board, rows):
+    grid = [row[:] for row in board.grid]
+    for y in rows:
+        grid[y] = [1] * BOARD_COLS
+    board.set_grid(grid)
+    return board
+
+
+@benchmark("board.clear_lines.none", "calls")
+def clear_lines_none():
+    rng = random.Random(3)
+    return _clear_lines([random_board(rng) for _ in range(256)])
+
+
+@benchmark("board.clear_lines.random", "calls")
+def clear_lines_random():
+    rng = random.Random(4)
+    boards = []
+    for _ in range(256):
+        board = random_board(rng, height=rng.randint(4, 16))
+        full = rng.sample(range(BOARD_ROWS - 4, BOARD_ROWS), rng.randint(0, 2))
+        boards.append(_with_full_rows(board, full))
+    return _clear_lines(boards)
+
+
+@benchmark("board.clear_lines.worst", "calls")
+def clear_lines_worst():
+    """高盤面＋4 列交錯的滿列（Tetris 且中間夾著未滿的列）。"""
+    rng = random.Random(5)
+    boards = [_with_full_rows(random_board(rng, height=18), [12, 14, 16, 19]) for _ in range(256)]
+    assert all(b.rows.count(FULL_ROW) == 4 for b in boards)
+    return _clear_lines(boards)
+
+
+# ---------- rotate ----------
+@benchmark("tetromino.rotate.kicks", "calls")
+def rotate_kicks():
+    """只挑基本旋轉會撞到、要靠 kick 才轉得過去的位置（貼牆 / 貼地 / 卡在縫裡）。"""
+    rng = random.Random(6)
+    boards = [random_board(rng, height=rng.randint(6, 12)) for _ in range(32)]
+    cases = []
+    while len(cases) < N_CASES:
+        board, piece = rng.choice(boards), random_piece(rng)
+        direction = rng.choice((1, -1))
+        if piece.shape_key == "O" or not board.valid_position(piece):
+            continue
+        turned = piece_at(piece.shape_key, (piece.r + direction) % 4, piece.x, piece.y)
+        if board.valid_position(turned):
+            continue                                  # 不需要 kick
+        trial = piece_at(piece.shape_key, piece.r, piece.x, piece.y)
+        if trial.rotate(direction, board):
+            cases.append((board, piece, direction, (piece.r, piece.x, piece.y)))
+
+    def run():
+        for board, piece, direction, (r, x, y) in cases:
+            piece.r, piece.x, piece.y = r, x, y
+            piece.rotate(direction, board)
+    return run, len(cases)
+
+
+# ---------- 整局 ----------
+def random_game(seed, max_pieces=200):
+    """隨機輸入（移動 / 旋轉後硬降）玩到 game over：量測引擎本身，不含 AI。"""
+    rng = random.Random(seed)
+    state = engine.GameState(difficulty="Normal", seed=seed)
+    moves = (engine.LEFT, engine.RIGHT, engine.ROTATE, engine.ROTATE_CCW, engine.SOFT_DROP)
+    while not state.over and state.pieces < max_pieces:
+        for _ in range(rng.randint(0, 6)):
+            state.step(rng.choice(moves))
+            state.tick(16)
+        state.step(engine.HARD_DROP)
+        state.drain_events()
+    return state
+
+
+@benchmark("engine.game.random_input", "games")
+def games_random():
+    seeds = range(8)                  # 固定的 seed，每次量測玩的是同樣的幾局
+
+    def run():
+        for seed in seeds:
+            random_game(seed)
+    return run, len(seeds)
+
+
+@benchmark("engine.game.bot", "pieces")
+def games_bot():
+    """AI（depth 1）玩 50 顆方塊：AI 搜尋＋引擎的整體吞吐量。"""
+    pieces = 50
+
+    def run():
+        state = engine.GameState(difficulty="Normal", seed=0)
+        table = ai.TranspositionTable()
+        while not state.over and state.pieces < pieces:
+            move = ai.state_move(state, depth=1, table=table)
+            for action in (move.actions if move else (engine.HARD_DROP,)):
+                state.step(action)
+            state.drain_events()
+        assert state.pieces == pieces
+    return run, pieces
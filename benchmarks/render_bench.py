@@ -0,0 +1,71 @@
+"""TetrisGame.render 的 FPS（SDL dummy video driver，不開真的視窗）。"""
+import os
+
+from .runner import benchmark
+
+FRAMES = 120
+
+
+def _game(seed=3, pieces=20):
+    """不跑選單、不開音訊，只建立 renderer 並讓 AI 先下幾顆方塊。"""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+
+    import ai
+    import engine
+    import game
+    import tetromino
+    from clock import VirtualClock
+    from settings import SCREEN_WIDTH, SCREEN_HEIGHT
+
+    pygame.display.init()
+    pygame.font.init()
+    g = game.TetrisGame.__new__(game.TetrisGame)
+    g.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    g.clock = VirtualClock()
+    g.init_render_state()
+    tetromino.BLOCK_IMAGES = tetromino.load_block_images(game.PREVIEW_CELL_SIZES)
+
+    g.state = engine.GameState(seed=seed)
+    for _ in range(pieces):
+        for action in ai.state_move(g.state, depth=1).actions:
+            g.state.step(action)
+    g.state.drain_events()
+    return g, engine
+
+
+@benchmark("render.full", "frames")
+def render_full():
+    """每幀整頁重畫（進入遊戲 / 換畫面時的路徑）。"""
+    g, _ = _game()
+
+    def run():
+        for _ in range(FRAMES):
+            g.invalidate()
+            g.render()
+    return run, FRAMES
+
+
+@benchmark("render.incremental", "frames")
+def render_incremental():
+    """一般遊玩：active piece 每幀左右移動一格，只更新變動的區域。"""
+    g, engine = _game()
+    g.render()
+
+    def run():
+        for i in range(FRAMES):
+            g.state.step(engine.LEFT if i & 1 else engine.RIGHT)
+            g.render()
+    return run, FRAMES
+
+
+@benchmark("render.idle", "frames")
+def render_idle():
+    """畫面沒有任何變化的幀。"""
+    g, _ = _game()
+    g.render()
+
+    def run():
+        for _ in range(FRAMES):
+            g.render()
+    return run, FRAMES
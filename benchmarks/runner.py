@@ -0,0 +1,102 @@
+"""基準登記、量測與基準比較。"""
+import json
+import platform
+import statistics
+import sys
+import time
+
+BENCHMARKS = {}          # 名稱 → (單位, setup 函式)
+
+
+def benchmark(name, unit="ops"):
+    """登記一個基準。setup() 回傳 (run, n)：run() 每呼叫一次執行 n 個操作。"""
+    def deco(setup):
+        BENCHMARKS[name] = (unit, setup)
+        return setup
+    return deco
+
+
+def measure(setup, warmup=2, repeat=7, min_time=0.2):
+    """暖身後重複量測；每次量測至少跑 min_time 秒（自動決定內圈次數）。"""
+    run, n = setup()
+    for _ in range(warmup):
+        run()
+
+    loops = 1
+    while True:                       # 找出讓一次量測 >= min_time 的內圈次數
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            run()
+        elapsed = time.perf_counter() - t0
+        if elapsed >= min_time:
+            break
+        loops = max(loops * 2, int(loops * min_time * 1.2 / max(elapsed, 1e-9)))
+
+    rates = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            run()
+        rates.append(loops * n / (time.perf_counter() - t0))
+    median = statistics.median(rates)
+    return {
+        "per_sec": median,
+        "min": min(rates),
+        "max": max(rates),
+        "spread": statistics.pstdev(rates) / median if median else 0.0,
+        "samples": len(rates),
+    }
+
+
+def run_all(pattern=None, warmup=2, repeat=7, min_time=0.2, quiet=False):
+    results = {}
+    for name, (unit, setup) in BENCHMARKS.items():
+        if pattern and pattern not in name:
+            continue
+        try:
+            result = measure(setup, warmup, repeat, min_time)
+        except ImportError as exc:        # 例如沒有 pygame → 略過繪圖基準
+            if not quiet:
+                print(f"{name:<34} skipped ({exc})", file=sys.stderr)
+            continue
+        result["unit"] = unit
+        results[name] = result
+        if not quiet:
+            print(f"{name:<34}{result['per_sec']:>14,.0f} {unit}/s  ±{result['spread'] * 100:4.1f}%",
+                  file=sys.stderr)
+    return results
+
+
+def metadata(args):
+    return {
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "warmup": args.warmup,
+        "repeat": args.repeat,
+        "min_time": args.min_time,
+    }
+
+
+def load(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=1)
+
+
+def compare(results, baseline, tolerance):
+    """回傳 [(名稱, 目前, 基準, 比例, 是否退步)]；比例 = 目前 / 基準。"""
+    rows = []
+    base = baseline.get("results", {})
+    for name, result in results.items():
+        if name not in base:
+            continue
+        ratio = result["per_sec"] / base[name]["per_sec"]
+        rows.append((name, result["per_sec"], base[name]["per_sec"], ratio, ratio < 1 - tolerance))
+    return rows
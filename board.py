@@ -1,68 +1,240 @@
+from typing import NamedTuple, Tuple
 
-import pygame
 from settings import BOARD_COLS, BOARD_ROWS, CELL_SIZE
 import tetromino  # 直接載入模組，隨時取得最新 BLOCK_IMAGES
+from tetromino import ROTATIONS
+
+# 一列填滿時的 bitmask（bit x = 第 x 欄）
+FULL_ROW = (1 << BOARD_COLS) - 1
+
+
+# ---------------- 盤面統計 ----------------
+class BoardStats(NamedTuple):
+    """Board.stats() 的結果（唯讀快照）。欄高 = ROWS − 最上方佔用格的列，空欄為 0；
+    洞 = 該欄最上方佔用格以下的空格。"""
+
+    heights: Tuple[int, ...]
+    column_holes: Tuple[int, ...]
+    row_fill: Tuple[int, ...]
+    aggregate_height: int
+    holes: int
+    bumpiness: int
+    wells: int
+
+
+def _column_spans():
+    """[shape][r] → ((欄偏移, 最上格列偏移, 最下格列偏移), ...)；方塊每欄的格子都是連續的。"""
+    table = {}
+    for key, states in ROTATIONS.items():
+        per_r = []
+        for o in states:
+            span = {}
+            for c, r in o.cells:
+                top, bottom = span.get(c, (r, r))
+                span[c] = (min(top, r), max(bottom, r))
+            per_r.append(tuple((c, top, bottom) for c, (top, bottom) in sorted(span.items())))
+        table[key] = tuple(per_r)
+    return table
+
+COLUMN_SPANS = _column_spans()
+
+
+def column_stats(rows):
+    """整盤掃描 rows，回傳 (各欄高度, 各欄洞數) 兩個 list。"""
+    heights = [0] * BOARD_COLS
+    holes = [0] * BOARD_COLS
+    cover = 0
+    for y, row in enumerate(rows):
+        gaps = cover & ~row
+        while gaps:
+            low = gaps & -gaps
+            holes[low.bit_length() - 1] += 1
+            gaps ^= low
+        new = row & ~cover
+        while new:
+            low = new & -new
+            heights[low.bit_length() - 1] = BOARD_ROWS - y
+            new ^= low
+        cover |= row
+    return heights, holes
+
+
+def lock_columns(heights, holes, shape, r, px, py):
+    """方塊 (shape, r) 鎖在 (px, py) 後原地更新 heights / holes（消行前），只動方塊佔到的欄。"""
+    for c, top, bottom in COLUMN_SPANS[shape][r]:
+        x = px + c
+        old_top = BOARD_ROWS - heights[x]
+        if py + top > old_top:                  # 塞進懸空結構下方：填掉洞
+            holes[x] -= bottom - top + 1
+        else:                                   # 疊在上面：與原本頂端之間的空格變成洞
+            holes[x] += old_top - (py + bottom) - 1
+            heights[x] = BOARD_ROWS - (py + top)
+
+
+def clear_columns(heights, holes, rows, top_cleared, cleared):
+    """消掉 cleared 列（最上面一列原本在 top_cleared）後原地更新 heights / holes；rows 為消行後的盤面。
+
+    滿列每一欄都有格子，所以頂端在 top_cleared 之上的欄只是整體下降、洞數不變；
+    頂端正好在被消的列上時往下找新的頂端，中間跳過的空格原本都是洞。
+    """
+    start = top_cleared + cleared               # 消行後這一列以上在該欄必定是空的
+    for x in range(BOARD_COLS):
+        if BOARD_ROWS - heights[x] < top_cleared:
+            heights[x] -= cleared
+            continue
+        bit = 1 << x
+        y = start
+        while y < BOARD_ROWS and not rows[y] & bit:
+            y += 1
+        heights[x] = BOARD_ROWS - y
+        holes[x] -= y - start
+
+
+def summarize(heights, holes):
+    """由欄高 / 洞數算出 (aggregate_height, holes, bumpiness, wells)。"""
+    bumpiness = wells = 0
+    prev = BOARD_ROWS                           # 左右牆壁視為與盤面等高
+    for c, h in enumerate(heights):
+        if c:
+            bumpiness += abs(h - prev)
+        right = heights[c + 1] if c < BOARD_COLS - 1 else BOARD_ROWS
+        depth = min(prev, right) - h
+        if depth > 0:
+            wells += depth
+        prev = h
+    return sum(heights), sum(holes), bumpiness, wells
+
 
 class Board:
     def __init__(self):
-        self.grid = [[0] * BOARD_COLS for _ in range(BOARD_ROWS)]
+        self.grid = [[0] * BOARD_COLS for _ in range(BOARD_ROWS)]  # 顏色 id（繪圖用）
+        self.rows = [0] * BOARD_ROWS                               # 佔用 bitmask（碰撞用）
         self.score = 0
+        self.version = 0   # 盤面（已固定的格子）每變動一次就 +1，前端據此重畫快取圖層
+        # 增量維護的統計（lock_piece / clear_lines 更新；外部請用 stats() 等唯讀介面）
+        self._fill = [0] * BOARD_ROWS          # 每列已佔用格數
+        self._heights = [0] * BOARD_COLS
+        self._holes = [0] * BOARD_COLS
+        self._stats = None                     # (version, BoardStats)
+
+    def set_grid(self, grid):
+        """以顏色格子整盤載入（快照 / 重播用），同時重建 bitmask 與統計。"""
+        self.grid = [list(row) for row in grid]
+        self.rows = [sum(1 << x for x, val in enumerate(row) if val) for row in self.grid]
+        self._fill = [row.bit_count() for row in self.rows]
+        self._heights, self._holes = column_stats(self.rows)
+        self.version += 1
+
+    # ---------------- 統計（唯讀）----------------
+    def height(self, x):
+        return self._heights[x]
+
+    def column_holes(self, x):
+        return self._holes[x]
+
+    def row_fill(self, y):
+        return self._fill[y]
+
+    def stats(self):
+        """目前盤面的 BoardStats；盤面沒變動時直接回傳同一個物件。"""
+        cached = self._stats
+        if cached is not None and cached[0] == self.version:
+            return cached[1]
+        heights, holes = tuple(self._heights), tuple(self._holes)
+        stats = BoardStats(heights, holes, tuple(self._fill), *summarize(heights, holes))
+        self._stats = (self.version, stats)
+        return stats
 
     # ---------------- 檢查合法位置 ----------------
     def valid_position(self, piece, dx=0, dy=0):
-        for x, y, _ in piece.get_cells():
-            x += dx
-            y += dy
+        left, right, top, bottom, masks, _, _, _ = ROTATIONS[piece.shape_key][piece.r]
+        x = piece.x + dx
+        y = piece.y + dy
 
-            # X 軸邊界
-            if not (0 <= x < BOARD_COLS):
-                return False
+        # X 軸邊界 / Y 超出下邊界
+        if x + left < 0 or x + right >= BOARD_COLS or y + bottom >= BOARD_ROWS:
+            return False
 
-            # Y 超出下邊界
-            if y >= BOARD_ROWS:
-                return False
-
-            # 只有 y >= 0 時才檢查碰撞（生成階段 y 可能 < 0）
-            if y >= 0 and self.grid[y][x]:
+        # 只有 y >= 0 時才檢查碰撞（生成階段 y 可能 < 0）
+        shift = x + left
+        rows = self.rows
+        for ry, mask in masks:
+            row = y + ry
+            if row >= 0 and rows[row] & (mask << shift):
                 return False
         return True
 
+    # ---------------- 落下距離 ----------------
+    def drop_distance(self, piece):
+        """piece 從目前位置直接落下能降幾格（hard drop / ghost piece 用）。
+
+        方塊每一欄都在該欄頂端之上時，由欄高一次算出；有某欄卡在懸空結構下方時，
+        才用 bitmask 逐列往下找第一個碰撞的位置。
+        """
+        x, y = piece.x, piece.y
+        heights = self._heights
+        dist = min(BOARD_ROWS - heights[x + c] - 1 - (y + bottom)
+                   for c, _, bottom in COLUMN_SPANS[piece.shape_key][piece.r])
+        if dist >= 0:
+            return dist
+        o = ROTATIONS[piece.shape_key][piece.r]
+        shift = x + o.left
+        rows = self.rows
+        dist = 0
+        while y + dist + 1 + o.bottom < BOARD_ROWS:
+            d = y + dist + 1
+            if any(d + ry >= 0 and rows[d + ry] & (mask << shift) for ry, mask in o.masks):
+                break
+            dist += 1
+        return dist
+
     # ---------------- 固定方塊＋消行 ----------------
-    
     def lock_piece(self, piece):
-        cleared = -1  # sentinel if game over
+        o = ROTATIONS[piece.shape_key][piece.r]
+        if piece.y + o.top < 0:
+            return -1              # game over
 
-        for x, y, val in piece.get_cells():
-            if y < 0:
-                return -1          # game over
-            self.grid[y][x] = val
+        px, py = piece.x, piece.y
+        for cx, cy in o.cells:
+            self.grid[py + cy][px + cx] = o.color
+        shift = px + o.left
+        rows, fill = self.rows, self._fill
+        for ry, mask in o.masks:
+            rows[py + ry] |= mask << shift
+            fill[py + ry] += mask.bit_count()
+        lock_columns(self._heights, self._holes, piece.shape_key, piece.r, px, py)
+        self.version += 1
 
-        cleared = self.clear_lines()
+        cleared = self.clear_lines(range(py + o.top, py + o.bottom + 1))
         self.score += cleared * 100
         return cleared            # 0~4 lines cleared
 
-        self.grid[y][x] = val
-
-        cleared = self.clear_lines()
-        self.score += cleared * 100
-        return True
-
-    def clear_lines(self):
-        new_grid = [row for row in self.grid if any(v == 0 for v in row)]
-        cleared = BOARD_ROWS - len(new_grid)
-        while len(new_grid) < BOARD_ROWS:
-            new_grid.insert(0, [0] * BOARD_COLS)
-        self.grid = new_grid
+    def clear_lines(self, candidates=None):
+        """消掉滿列；candidates 為可能變滿的列（lock_piece 傳入方塊佔到的列），省略時檢查整盤。"""
+        fill = self._fill
+        if candidates is None:
+            if BOARD_COLS not in fill:
+                return 0
+            candidates = range(BOARD_ROWS)
+        full = [y for y in candidates if fill[y] == BOARD_COLS]
+        if not full:
+            return 0
+        rows, grid = self.rows, self.grid
+        for y in reversed(full):
+            del rows[y], grid[y], fill[y]
+        cleared = len(full)
+        rows[:0] = [0] * cleared
+        fill[:0] = [0] * cleared
+        grid[:0] = [[0] * BOARD_COLS for _ in range(cleared)]
+        clear_columns(self._heights, self._holes, rows, full[0], cleared)
+        self.version += 1
         return cleared
 
     # ---------------- 繪製 ----------------
-    def draw(self, surface, offset_x, offset_y):
-        for row_idx, row in enumerate(self.grid):
-            for col_idx, val in enumerate(row):
-                if val:
-                    img = tetromino.BLOCK_IMAGES[val]
-                    surface.blit(
-                        img,
-                        (offset_x + col_idx * CELL_SIZE,
-                         offset_y + row_idx * CELL_SIZE)
-                    )
+    def draw(self, surface, offset_x, offset_y, size=CELL_SIZE):
+        """把已固定的格子畫到 surface；size 為每格邊長（縮小顯示時用 atlas 預先縮放好的圖）。"""
+        get = tetromino.BLOCK_IMAGES.get
+        rows = self.rows
+        surface.blits([(get(val, size), (offset_x + col_idx * size, offset_y + row_idx * size))
+                       for row_idx, row in enumerate(self.grid) if rows[row_idx]
+                       for col_idx, val in enumerate(row) if val], doreturn=False)
@@ -0,0 +1,317 @@
+"""離屏擷取：不開視窗（SDL dummy driver）把對局畫到 Surface，以 pygame.surfarray 取成
+NumPy 陣列，並經由有界佇列交給背景執行緒寫成 PNG 序列或 raw 影格（rgb24）。
+
+    python -m capture replay Replays/replay_x.trp --out frames/ --fps 30
+    python -m capture bot --seed 3 --pieces 200 --out game.rgb --format raw --view board --cell 8
+    python -m capture bot --seed 3 --pieces 5000 --out boards/ --every-piece --view board
+
+raw 檔可直接交給 ffmpeg：ffmpeg -f rawvideo -pix_fmt rgb24 -s WxH -r FPS -i game.rgb out.mp4
+"""
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")     # 必須在 pygame 開啟顯示之前設定
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import queue
+import threading
+import time
+
+import numpy as np
+import pygame
+
+import settings as cfg
+from settings import BOARD_COLS, BOARD_ROWS, CELL_SIZE, SCREEN_HEIGHT, SCREEN_WIDTH
+import replay
+import tetromino
+
+PNG, RAW = "png", "raw"
+SCREEN, BOARD = "screen", "board"
+
+
+def init_headless():
+    """開啟 dummy 顯示（convert() / 載入方塊圖需要一個顯示 Surface）。"""
+    if not pygame.display.get_init():
+        pygame.display.init()
+        pygame.font.init()
+    if pygame.display.get_surface() is None:
+        pygame.display.set_mode((1, 1))
+    if tetromino.BLOCK_IMAGES is None:
+        import game
+        tetromino.BLOCK_IMAGES = tetromino.load_block_images(game.PREVIEW_CELL_SIZES)
+
+
+def to_array(surface, out=None):
+    """Surface → (高, 寬, 3) uint8 陣列；out 有給時原地寫入（不配置新陣列）。"""
+    pixels = pygame.surfarray.pixels3d(surface)     # (寬, 高, 3) 的 view，會鎖住 surface
+    try:
+        if out is None:
+            return pixels.transpose(1, 0, 2).copy()
+        np.copyto(out, pixels.transpose(1, 0, 2))
+        return out
+    finally:
+        del pixels
+
+
+# ---------- 畫面 ----------
+class ScreenRenderer:
+    """完整遊戲畫面：直接使用 TetrisGame.render（含 dirty-rect 快取），只是畫在離屏 Surface 上。"""
+
+    def __init__(self):
+        import game
+        init_headless()
+        self.game = game.TetrisGame.__new__(game.TetrisGame)
+        self.game.screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+        self.game.init_render_state()
+        self.surface = self.game.screen
+
+    def draw(self, state):
+        self.game.state = state
+        self.game.render()
+        return self.surface
+
+
+class BoardRenderer:
+    """只有盤面（資料集用）：Board.draw 畫成 cell 大小的格子，已固定的格子快取成圖層。"""
+
+    def __init__(self, cell=CELL_SIZE, piece=True):
+        init_headless()
+        self.cell, self.piece = cell, piece
+        tetromino.BLOCK_IMAGES.prescale([cell])
+        self.surface = pygame.Surface((BOARD_COLS * cell, BOARD_ROWS * cell)).convert()
+        self.layer = self.surface.copy()
+        self.layer_key = None
+
+    def draw(self, state):
+        board, cell = state.board, self.cell
+        if (board, board.version) != self.layer_key:
+            self.layer.fill((0, 0, 0))
+            board.draw(self.layer, 0, 0, cell)
+            self.layer_key = (board, board.version)
+        self.surface.blit(self.layer, (0, 0))
+        if self.piece and not state.over:
+            get = tetromino.BLOCK_IMAGES.get
+            self.surface.blits([(get(v, cell), (x * cell, y * cell))
+                                for x, y, v in state.current.get_cells() if y >= 0], doreturn=False)
+        return self.surface
+
+
+def make_renderer(view=SCREEN, cell=CELL_SIZE, piece=True):
+    return ScreenRenderer() if view == SCREEN else BoardRenderer(cell, piece)
+
+
+# ---------- 寫檔 ----------
+class FrameWriter:
+    """背景執行緒把影格寫成 PNG 序列（path 為資料夾）或單一 raw rgb24 檔。
+
+    佇列有上限 maxsize，影格緩衝區循環使用：寫檔跟不上時 write() 會等待，記憶體用量固定。
+    with FrameWriter(...) as w: w.write(surface_or_array)
+    """
+
+    def __init__(self, path, fmt=PNG, maxsize=64):
+        if fmt not in (PNG, RAW):
+            raise ValueError(f"unknown frame format: {fmt!r}")
+        self.path, self.fmt = path, fmt
+        self.frames = 0
+        self.shape = None
+        self.queue = queue.Queue(maxsize)
+        self.free = queue.Queue()
+        self.buffers = 0
+        self.maxsize = maxsize
+        self.error = None
+        if fmt == PNG:
+            os.makedirs(path, exist_ok=True)
+            self.file = None
+        else:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self.file = open(path, "wb")
+        self.thread = threading.Thread(target=self._work, name="frame-writer", daemon=True)
+        self.thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _buffer(self, shape):
+        """取一個空的緩衝區；全部都在佇列裡時等 worker 寫完一個。"""
+        if self.shape is None:
+            self.shape = shape
+        elif shape != self.shape:
+            raise ValueError(f"frame shape changed from {self.shape} to {shape}")
+        try:
+            return self.free.get_nowait()
+        except queue.Empty:
+            if self.buffers < self.maxsize + 2:
+                self.buffers += 1
+                return np.empty(shape, np.uint8)
+            return self.free.get()
+
+    def write(self, frame):
+        """frame：Surface 或 (高, 寬, 3) uint8 陣列；內容會先複製，呼叫後可立即重畫。"""
+        if self.error is not None:
+            raise self.error
+        if isinstance(frame, pygame.Surface):
+            w, h = frame.get_size()
+            buf = to_array(frame, self._buffer((h, w, 3)))
+        else:
+            buf = self._buffer(frame.shape)
+            np.copyto(buf, frame)
+        self.queue.put((self.frames, buf))
+        self.frames += 1
+
+    def _work(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            index, buf = item
+            try:
+                if self.error is None:
+                    if self.fmt == PNG:
+                        surf = pygame.image.frombuffer(buf.tobytes(), (buf.shape[1], buf.shape[0]), "RGB")
+                        pygame.image.save(surf, os.path.join(self.path, f"frame_{index:06d}.png"))
+                    else:
+                        self.file.write(memoryview(buf).cast("B"))
+            except Exception as e:             # 交給主執行緒在下一次 write() / close() 拋出
+                self.error = e
+            self.free.put(buf)
+
+    def close(self):
+        if self.thread is not None:
+            self.queue.put(None)
+            self.thread.join()
+            self.thread = None
+            if self.file:
+                self.file.close()
+        if self.error is not None:
+            raise self.error
+
+
+# ---------- 來源 ----------
+def replay_states(path, fps=None, every_piece=False):
+    """重播的每一幀（fps）或每次鎖入後（every_piece）的 GameState；產生的是同一個物件。"""
+    player = replay.Player(replay.Replay.load(path))
+    if every_piece:
+        yield from _lock_states(player.state, player.replay)
+        return
+    step = 1000 / (fps or cfg.FPS)
+    t = 0.0
+    while True:
+        player.advance_to(int(t))
+        player.state.drain_events()
+        yield player.state
+        if player.finished:
+            return
+        t += step
+
+
+def _lock_states(state, rep):
+    """每次鎖入後產生一次 state，包括兩個輸入之間被重力鎖入的方塊。
+
+    Player.advance_to 在輸入之間整段 tick，重力鎖入後緊接著 hard drop 會被合併成一次；
+    這裡改為一次只推進到下一次自然下落，每一步之後比對 state.pieces。
+    """
+    pieces = state.pieces
+    for t, action in rep.inputs + [(rep.end_time, None)]:
+        while not state.over:
+            due = state.drop_timer + state.gravity_delay()
+            if due > t:
+                break
+            state.tick(max(0, due - state.time_ms))
+            if state.pieces != pieces:
+                pieces = state.pieces
+                state.drain_events()
+                yield state
+        if state.over or action is None:
+            return
+        state.tick(t - state.time_ms)
+        state.step(action)
+        if state.pieces != pieces:
+            pieces = state.pieces
+            state.drain_events()
+            yield state
+
+
+def bot_states(seed=0, pieces=200, fps=None, every_piece=False, **kwargs):
+    """AI 遊玩一局（與觀戰牆相同的 BotFeed），到 game over 或 pieces 顆為止。"""
+    from wall import BotFeed
+    feed = BotFeed(seed, **kwargs)
+    state = feed.state
+    step = 1000 / (fps or cfg.FPS)
+    t, placed = 0.0, 0
+    while not state.over and state.pieces < pieces:
+        t += step
+        feed.advance(int(t) - state.time_ms)
+        if not every_piece:
+            yield state
+        elif state.pieces != placed:
+            placed = state.pieces
+            yield state
+
+
+def frames(states, renderer, limit=None):
+    """把 states 逐一畫出並產生 (高, 寬, 3) 的 NumPy 影格；每次都是同一個陣列，需要保留請 copy。"""
+    out = None
+    for i, state in enumerate(states):
+        if limit is not None and i >= limit:
+            return
+        surface = renderer.draw(state)
+        if out is None:
+            w, h = surface.get_size()
+            out = np.empty((h, w, 3), np.uint8)
+        yield to_array(surface, out)
+
+
+def capture(states, renderer, writer, limit=None):
+    """把 states 逐一畫出交給 writer，回傳張數。"""
+    count = 0
+    for i, state in enumerate(states):
+        if limit is not None and i >= limit:
+            break
+        writer.write(renderer.draw(state))
+        count += 1
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m capture", description="離屏擷取遊戲畫面")
+    sub = parser.add_subparsers(dest="source", required=True)
+    src_replay = sub.add_parser("replay", help="從重播檔")
+    src_replay.add_argument("path")
+    src_bot = sub.add_parser("bot", help="即時模擬一局 AI 對局")
+    src_bot.add_argument("--seed", type=int, default=0)
+    src_bot.add_argument("--pieces", type=int, default=200)
+    for p in (src_replay, src_bot):
+        p.add_argument("--out", required=True, help="PNG：輸出資料夾；raw：輸出檔")
+        p.add_argument("--format", choices=(PNG, RAW), default=PNG)
+        p.add_argument("--view", choices=(SCREEN, BOARD), default=SCREEN)
+        p.add_argument("--cell", type=int, default=CELL_SIZE, help="--view board 的格子邊長")
+        p.add_argument("--fps", type=float, default=30)
+        p.add_argument("--every-piece", action="store_true", help="每鎖入一顆方塊擷取一張（資料集用）")
+        p.add_argument("--limit", type=int, help="最多幾張")
+        p.add_argument("--queue", type=int, default=64, help="寫檔佇列長度")
+    args = parser.parse_args(argv)
+
+    if args.source == "replay":
+        states = replay_states(args.path, args.fps, args.every_piece)
+    else:
+        states = bot_states(args.seed, args.pieces, args.fps, args.every_piece)
+    renderer = make_renderer(args.view, args.cell, piece=not args.every_piece)
+
+    start = time.perf_counter()
+    with FrameWriter(args.out, args.format, args.queue) as writer:
+        capture(states, renderer, writer, args.limit)
+    elapsed = time.perf_counter() - start
+    h, w = writer.shape[:2] if writer.shape else (0, 0)
+    line = f"{writer.frames} frames {w}x{h} in {elapsed:.1f}s ({writer.frames / max(elapsed, 1e-9):.0f} frames/s"
+    if not args.every_piece:
+        line += f", {writer.frames / args.fps / max(elapsed, 1e-9):.1f}x realtime"
+    print(line + ")")
+    if args.format == RAW:
+        print(f"ffmpeg -f rawvideo -pix_fmt rgb24 -s {w}x{h} -r {args.fps:g} -i {args.out} out.mp4")
+
+
+if __name__ == "__main__":
+    main()
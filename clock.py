@@ -0,0 +1,42 @@
+"""可替換的時鐘：RealClock 用於實際遊玩，VirtualClock 讓模擬 / 重播 / 測試不必等待真實時間。"""
+
+
+class RealClock:
+    """真實時間（pygame ticks），tick() 依 FPS 節流。"""
+
+    def __init__(self):
+        import pygame
+        self._pygame = pygame
+        self._clock = pygame.time.Clock()
+
+    def now(self):
+        return self._pygame.time.get_ticks()
+
+    def tick(self, fps=0):
+        return self._clock.tick(fps)
+
+    def wait(self, ms):
+        self._pygame.time.wait(ms)
+
+
+class VirtualClock:
+    """虛擬時間：tick() 立即回傳一個 frame 的長度，CPU 多快就跑多快。"""
+
+    def __init__(self, start_ms=0):
+        self._now = start_ms
+        self._exact = float(start_ms)    # 累計小數部分，60 FPS 也不會漂移
+
+    def now(self):
+        return self._now
+
+    def advance(self, ms):
+        self._exact += ms
+        self._now = int(self._exact)
+
+    def tick(self, fps=0):
+        before = self._now
+        self.advance(1000 / fps if fps else 0)
+        return self._now - before
+
+    def wait(self, ms):
+        self.advance(ms)
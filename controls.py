@@ -0,0 +1,130 @@
+"""鍵盤輸入管線：按鍵事件帶時間戳排隊，依精確時間點套用到引擎（含 DAS / ARR 重複），
+並量測從按下按鍵到畫面更新的延遲。
+
+pygame 的事件本身沒有時間戳，所以等待下一幀時以 INPUT_POLL_MS 為間隔持續輪詢，
+時間戳的誤差約為輪詢間隔，而不是整個 frame。
+"""
+from collections import deque
+
+import pygame
+
+import settings as cfg
+import engine
+
+LATENCY_WINDOW = 240          # 延遲統計保留最近幾筆
+
+
+class InputPipeline:
+    """game_loop 用法：pump_until() 等待並收集事件 → drain() 取走非遊戲按鍵的事件 →
+    每個邏輯步 advance(state, end) → 畫面更新後 presented()。"""
+
+    def __init__(self, clock, keys, das_ms, arr_ms, capture=True):
+        self.clock = clock
+        self.keys = keys
+        self.das_ms, self.arr_ms = das_ms, arr_ms
+        self.capture = capture              # False（Demo）：按鍵不排隊，全部交給前端
+        self.queue = deque()                # (真實時間 ms, 事件)
+        self.events = []                    # 交給前端處理的事件（QUIT、音樂結束、ESC…）
+        self.offset = 0                     # 真實時間 − 引擎時間
+        self.move_dir = 0
+        self.next_repeat = 0                # 下一次 DAS / ARR 重複的引擎時間
+        self.pending = []                   # 已套用、尚未顯示在畫面上的按鍵時間戳
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    # ---------- 收集 ----------
+    def sync(self, state):
+        """以目前時間對齊引擎時間（開局時呼叫）。"""
+        self.offset = self.clock.now() - state.time_ms
+
+    def drop(self, ms):
+        """主迴圈捨棄了 ms 毫秒的邏輯時間（frame-skip 上限），引擎時間與真實時間的差跟著增加。"""
+        self.offset += ms
+
+    def poll(self):
+        bound = self.keys.values()
+        now = self.clock.now()
+        for e in pygame.event.get():
+            if self.capture and e.type in (pygame.KEYDOWN, pygame.KEYUP) and e.key in bound:
+                self.queue.append((now, e))
+            else:
+                self.events.append(e)
+
+    def pump_until(self, deadline):
+        """等到 deadline（真實時間 ms），期間每 INPUT_POLL_MS 輪詢一次事件。"""
+        self.poll()
+        while self.clock.now() < deadline:
+            self.clock.wait(min(cfg.INPUT_POLL_MS, max(1, int(deadline - self.clock.now()))))
+            self.poll()
+
+    def drain(self):
+        events, self.events = self.events, []
+        return events
+
+    # ---------- 套用 ----------
+    def advance(self, state, end):
+        """把 state 推進到引擎時間 end；途中的按鍵與 DAS / ARR 重複都在各自的時間點套用。"""
+        queue = self.queue
+        while not state.over:
+            key_t = queue[0][0] - self.offset if queue else None
+            rep_t = self.next_repeat if self.move_dir else None
+            if rep_t is not None and (key_t is None or rep_t < key_t):
+                t, repeat = rep_t, True     # 同一毫秒時按鍵優先（例如放開方向鍵）
+            elif key_t is not None:
+                t, repeat = key_t, False
+            else:
+                break
+            if t > end:
+                break
+            if t > state.time_ms:
+                state.tick(t - state.time_ms)
+            if repeat:
+                state.step(engine.LEFT if self.move_dir < 0 else engine.RIGHT)
+                self.next_repeat = t + self.arr_ms
+            else:
+                stamp, e = queue.popleft()
+                self.apply(state, e)
+                self.pending.append(stamp)
+        if end > state.time_ms:
+            state.tick(end - state.time_ms)
+
+    def apply(self, state, e):
+        keys, now = self.keys, state.time_ms
+        if e.type == pygame.KEYDOWN:
+            if e.key == keys["LEFT"]:
+                self.move_dir = -1; state.step(engine.LEFT); self.next_repeat = now + self.das_ms
+            elif e.key == keys["RIGHT"]:
+                self.move_dir = 1;  state.step(engine.RIGHT); self.next_repeat = now + self.das_ms
+            elif e.key == keys["DOWN"]:
+                state.step(engine.DOWN_PRESS)
+            elif e.key == keys["ROTATE"]:
+                state.step(engine.ROTATE)
+            elif e.key == keys["HARD_DROP"]:
+                state.step(engine.HARD_DROP)
+            elif e.key == keys["HOLD"]:
+                state.step(engine.HOLD)
+        else:
+            if e.key in (keys["LEFT"], keys["RIGHT"]):
+                self.move_dir = 0
+            if e.key == keys["DOWN"]:
+                state.step(engine.DOWN_RELEASE)
+
+    # ---------- 延遲 ----------
+    def presented(self, now=None):
+        """畫面已更新：記錄這段期間套用的每個按鍵從按下到顯示的延遲。"""
+        if self.pending:
+            now = self.clock.now() if now is None else now
+            self.latencies.extend(now - t for t in self.pending)
+            self.pending.clear()
+
+    def latency_stats(self):
+        """最近 LATENCY_WINDOW 次按鍵的輸入→畫面延遲（ms）。"""
+        lat = sorted(self.latencies)
+        if not lat:
+            return {"count": 0, "last": None, "mean": None, "p95": None, "max": None}
+        return {
+            "count": len(lat),
+            "last": self.latencies[-1],
+            "mean": sum(lat) / len(lat),
+            "p95": lat[min(len(lat) - 1, int(len(lat) * 0.95))],
+            "max": lat[-1],
+        }
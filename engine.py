@@ -0,0 +1,317 @@
+"""純 Python 的遊戲規則核心（不 import pygame），供 TetrisGame 與 headless 模擬共用。"""
+import settings as cfg
+from settings import BOARD_COLS
+from board import Board
+from tetromino import PieceGenerator, Tetromino
+
+# --------- 參數 ---------
+LOCK_DELAY           = 500            # ms
+INITIAL_FALL_DELAY   = 1000           # 等級 0 自然落下
+SOFT_DROP_DELAY      = 120            # 按住 DOWN 的初始下落間隔
+FLASH_DURATION_MS    = 1500           # 閃現分數顯示 1.5 秒
+BASE_FALL_DELAY      = {"Easy": 1500, "Normal": 800, "Hard": 200}
+
+# --------- 動作 ---------
+LEFT, RIGHT         = "left", "right"
+ROTATE, ROTATE_CCW  = "rotate", "rotate_ccw"
+SOFT_DROP           = "soft_drop"      # 立即下移一格
+HARD_DROP           = "hard_drop"
+HOLD                = "hold"
+DOWN_PRESS          = "down_press"     # 開始 / 結束加速下落
+DOWN_RELEASE        = "down_release"
+
+ACTIONS = (LEFT, RIGHT, ROTATE, ROTATE_CCW, SOFT_DROP, HARD_DROP, HOLD, DOWN_PRESS, DOWN_RELEASE)
+
+
+class GameState:
+    """一局遊戲的完整狀態與規則；時間只由 tick(ms) 推進。"""
+
+    def __init__(self, difficulty=None, seed=None, randomizer=None, preview_count=None):
+        self.difficulty = difficulty or cfg.DIFFICULTY
+        self.seed = seed
+        self.randomizer = randomizer or cfg.RANDOMIZER
+        self.preview_count = preview_count or cfg.PREVIEW_COUNT
+        self.recorder = None            # 有設定時每個輸入 / 落點都會交給它記錄（見 replay.Recorder）
+        self.reset()
+
+    # ---------- 開啟一局 ----------
+    def reset(self):
+        self.generator = PieceGenerator(self.seed, self.randomizer)
+        self.board = Board()
+        self.current = None
+        self.hold_piece, self.hold_locked = None, False
+
+        # 計分參數
+        self.score = 0
+        self.lines = 0
+        self.level = 0
+        self.b2b   = False      # Back-to-Back 旗標
+        self.pieces = 0         # 已鎖入的方塊數
+        self.tspins = 0         # 計分的 T-Spin 次數
+
+        # 時間控制（皆為本局經過的毫秒數）
+        self.time_ms    = 0
+        self.fall_delay = INITIAL_FALL_DELAY
+        self.drop_timer = 0
+        self.lock_timer = None
+
+        # 加速下落
+        self.down_pressed = False
+        self.down_start   = 0
+        self.down_delay   = SOFT_DROP_DELAY
+
+        self.flash_points     = 0       # 這次清行得到多少分
+        self.flash_start_time = 0       # 開始顯示的時間戳
+
+        self.over   = False
+        self.events = []                # (名稱, 值)，由前端取走播放音效等
+        self._ghost = None              # ((方塊, r, x, 盤面 version), 計算時的 y, 落點 y)
+        self.spawn_piece()
+
+    # ---------- 對外 API ----------
+    def step(self, action):
+        """套用一個動作；回傳動作是否生效。"""
+        if self.over:
+            return False
+        if self.recorder is not None:
+            self.recorder.record(self, action)
+        if action == LEFT:           return self.move(-1)
+        if action == RIGHT:          return self.move(1)
+        if action == ROTATE:         return self.rotate(1)
+        if action == ROTATE_CCW:     return self.rotate(-1)
+        if action == SOFT_DROP:      return self.soft_drop()
+        if action == HARD_DROP:      self.hard_drop(); return True
+        if action == HOLD:           return self.hold()
+        if action == DOWN_PRESS:
+            self.down_pressed = True
+            self.down_start   = self.time_ms
+            self.down_delay   = SOFT_DROP_DELAY
+            return True
+        if action == DOWN_RELEASE:
+            self.down_pressed = False
+            return True
+        raise ValueError(f"unknown action: {action!r}")
+
+    def tick(self, ms):
+        """推進 ms 毫秒，期間到期的每次自然下落都會在其精確時間點執行。"""
+        end = self.time_ms + ms
+        while not self.over:
+            due = self.drop_timer + self.gravity_delay()
+            if due > end:
+                break
+            self.time_ms = max(self.time_ms, due)
+            self.drop_timer = self.time_ms
+            self.soft_drop()
+        self.time_ms = end
+
+    @property
+    def next_piece(self):
+        return self.generator.peek(1)[0]
+
+    @property
+    def previews(self):
+        """接下來 preview_count 顆方塊（[0] 即 next_piece）。"""
+        return self.generator.peek(self.preview_count)
+
+    # ---------- 快照 ----------
+    SNAPSHOT_FIELDS = (
+        "time_ms", "fall_delay", "drop_timer", "lock_timer",
+        "down_pressed", "down_start", "down_delay",
+        "score", "lines", "level", "b2b", "pieces", "tspins",
+        "flash_points", "flash_start_time", "hold_locked", "over",
+    )
+
+    def snapshot(self):
+        """目前局面的純資料快照（不含 seed / 設定），可用 restore() 還原。"""
+        snap = {name: getattr(self, name) for name in self.SNAPSHOT_FIELDS}
+        snap["dealt"] = self.generator.dealt
+        snap["grid"] = [row[:] for row in self.board.grid]
+        snap["board_score"] = self.board.score
+        for name in ("current", "hold_piece"):
+            p = getattr(self, name)
+            snap[name] = p and (p.shape_key, p.r, p.x, p.y, p.rotated)
+        return snap
+
+    def restore(self, snap):
+        for name in self.SNAPSHOT_FIELDS:
+            setattr(self, name, snap[name])
+        # 方塊序列由 seed 決定，重新發牌到同一位置即可
+        self.generator = PieceGenerator(self.seed, self.randomizer)
+        for _ in range(snap["dealt"]):
+            self.generator.next()
+        self.board = Board()
+        self.board.set_grid(snap["grid"])
+        self.board.score = snap["board_score"]
+        for name in ("current", "hold_piece"):
+            data = snap[name]
+            p = None
+            if data:
+                p = Tetromino(data[0])
+                _, p.r, p.x, p.y, p.rotated = data
+            setattr(self, name, p)
+        self.events = []
+        self._ghost = None
+
+    def drain_events(self):
+        events, self.events = self.events, []
+        return events
+
+    def gravity_delay(self):
+        base_delay = BASE_FALL_DELAY.get(self.difficulty, 1500)
+        self.fall_delay = max(50, int(base_delay * (0.85 ** self.level)))
+        if not self.down_pressed:
+            return self.fall_delay
+        held = max(0, self.drop_timer - self.down_start)
+        self.down_delay = max(20, SOFT_DROP_DELAY - (held // 200) * 10)
+        return self.down_delay
+
+    # ---------- 產生新方塊 ----------
+    def spawn_piece(self):
+        self.current = self.generator.next()
+        self._place_at_spawn(self.current)
+        self.hold_locked = False
+        self.lock_timer = None
+        if not self.board.valid_position(self.current):
+            self.game_over()
+
+    def _place_at_spawn(self, piece):
+        piece.x = BOARD_COLS//2 - len(piece.matrix[0])//2
+        piece.y = -2
+        piece.rotated = False
+
+    # ---------- HOLD ----------
+    def hold(self):
+        if self.hold_locked: return False
+        if self.hold_piece is None:
+            self.hold_piece = self.current; self.spawn_piece()
+        else:
+            self.current, self.hold_piece = self.hold_piece, self.current
+            self._place_at_spawn(self.current)
+        self.hold_locked = True
+        return True
+
+    # ---------- DROP ----------
+    def ghost_y(self):
+        """目前方塊直接落下後的 y（ghost piece / hard drop）。
+
+        以 (方塊, r, x, 盤面 version) 快取，並記下計算時的 y：重力 / 軟降只讓方塊沿同一條
+        路徑往下，y 仍在 [計算時的 y, 落點] 之間時落點不變。踢牆可能讓方塊以相同的 r、x
+        出現在這段路徑之外（例如更高處的平台上方），此時重算。
+        """
+        piece = self.current
+        key = (piece, piece.r, piece.x, self.board.version)
+        ghost = self._ghost
+        if ghost is None or ghost[0] != key or not ghost[1] <= piece.y <= ghost[2]:
+            ghost = self._ghost = (key, piece.y, piece.y + self.board.drop_distance(piece))
+        return ghost[2]
+
+    def hard_drop(self):
+        y = self.ghost_y()
+        if y != self.current.y:
+            self.current.rotated = False       # 有往下落：最後一個動作不再是旋轉
+        self.current.y = y
+        self.lock_piece()
+
+    # ---------- 鎖入 ----------
+    def lock_piece(self):
+        cleared = self.board.lock_piece(self.current)     # -1 = game over
+        if cleared == -1:
+            self.game_over(); return
+
+        # ----- T-Spin 判定（簡化）：T 方塊且最後一個成功的動作是旋轉 -----
+        is_tspin = (
+            self.current.shape_key == "T"
+            and self.current.rotated
+            and cleared > 0
+        )
+
+        self.pieces += 1
+        if is_tspin and cleared in (2, 3):      # 與 update_score 相同：只有 Double / Triple 以 T-Spin 計分
+            self.tspins += 1
+        self.update_score(cleared, is_tspin)
+        self.events.append(("lock", cleared))
+        if self.recorder is not None:
+            self.recorder.placed(self, self.current, cleared)
+        self.spawn_piece()
+
+    # ---------- 計分 ----------
+    def update_score(self, cleared, is_tspin):
+        if cleared == 0:
+            self.b2b = False
+            return
+
+        level_mul = self.level + 1
+        difficult = False
+        points    = 0
+
+        if is_tspin and cleared == 2:            # T-Spin Double
+            points = 12 * level_mul
+            difficult = True
+        elif is_tspin and cleared == 3:          # T-Spin Triple
+            points = 36 * level_mul
+            difficult = True
+        elif cleared == 4:                       # Tetris
+            points = 8 * level_mul
+            difficult = True
+        else:                                    # 一般單/雙/三消
+            points = {1: 1, 2: 3, 3: 5}[cleared] * level_mul
+
+        # Back-to-Back 加成
+        if difficult and self.b2b:
+            points = int(points * 1.5)           # +50 %
+        self.score += points
+
+        # 更新 B2B 狀態
+        self.b2b = difficult
+
+        # 升級
+        self.lines += cleared
+        if self.lines // 10 > self.level:
+            self.level += 1
+
+        # -------- Back-to-Back 與升級計算都做完後 ----------
+        self.flash_points     = points         # 記下剛才拿到的分數
+        self.flash_start_time = self.time_ms
+
+    def flash_visible(self, now=None):
+        """now：要判斷的時間點（前端 render 插值用），預設為目前引擎時間。"""
+        if now is None:
+            now = self.time_ms
+        return bool(self.flash_points) and now - self.flash_start_time <= FLASH_DURATION_MS
+
+    # ---------- ROTATE / MOVE ----------
+    def rotate(self, dir=1):
+        if self.current.rotate(dir, self.board):
+            self.lock_timer = None
+            self.current.rotated = True
+            return True
+        return False
+
+    def move(self, dx):
+        if self.board.valid_position(self.current, dx=dx):
+            self.current.x += dx
+            self.current.rotated = False
+            self.lock_timer = None
+            return True
+        return False
+
+    # ---------- SOFT DROP ----------
+    def soft_drop(self):
+        if self.board.valid_position(self.current, dy=1):
+            self.current.y += 1
+            self.current.rotated = False         # 軟降與重力下落都算移動
+            self.lock_timer = None
+            return True
+        now = self.time_ms
+        if self.lock_timer is None:
+            self.lock_timer = now
+        elif now - self.lock_timer >= LOCK_DELAY:
+            self.lock_piece()
+            return True
+        return False
+
+    # ---------- GAME OVER ----------
+    def game_over(self):
+        if not self.over:
+            self.over = True
+            self.events.append(("game_over", self.score))
@@ -0,0 +1,206 @@
+"""強化學習用的環境介面（gymnasium 風格的 reset / step，但不依賴 gym）。
+
+    env = TetrisEnv(mode="placement")
+    obs, info = env.reset(seed=0)
+    obs, reward, terminated, truncated, info = env.step(action)
+
+兩種動作空間：
+  - "placement"：動作 = hold * 4 * COLS + r * COLS + 最左欄，直接放到該落點
+    （action_mask 標出目前可到達的落點，路徑由 ai.placements 產生）。
+  - "keypress"：動作 = engine.ACTIONS 的索引，NOOP（= len(ACTIONS)）代表不按鍵；
+    每一步之後引擎前進 step_ms 毫秒（重力 / 鎖定延遲照常運作）。
+
+觀察值寫進預先配置好的 int8 buffer，每一步原地覆寫、回傳的永遠是同一個陣列
+（需要保留時請自行 copy）：盤面佔用 ROWS*COLS、各欄高度 COLS、
+方塊 [目前, hold（-1 = 無）, next...]（SHAPE_KEYS 的索引）。
+VectorEnv 把多個環境的 buffer 排成同一個 (N, obs_size) 陣列，整批取用不必複製。
+"""
+import numpy as np
+
+import ai
+import engine
+from settings import BOARD_COLS, BOARD_ROWS
+from tetromino import ROTATIONS, SHAPE_KEYS, Tetromino
+
+PLACEMENT, KEYPRESS = "placement", "keypress"
+NOOP = len(engine.ACTIONS)
+
+_SHAPE_INDEX = {key: i for i, key in enumerate(SHAPE_KEYS)}
+_BITS = (1 << np.arange(BOARD_COLS, dtype=np.int32))[None, :]     # (1, COLS)：第 x 欄的 bit
+
+
+def observation_size(preview=1):
+    return BOARD_ROWS * BOARD_COLS + BOARD_COLS + 2 + preview
+
+
+def action_count(mode):
+    return 2 * 4 * BOARD_COLS if mode == PLACEMENT else NOOP + 1
+
+
+class TetrisEnv:
+    """單一環境；規則即 engine.GameState。"""
+
+    def __init__(self, mode=PLACEMENT, preview=1, difficulty="Normal", randomizer=None,
+                 step_ms=16, max_steps=None, buffer=None, mask_buffer=None):
+        if mode not in (PLACEMENT, KEYPRESS):
+            raise ValueError(f"unknown action mode: {mode!r}")
+        self.mode = mode
+        self.preview = preview
+        self.difficulty = difficulty
+        self.randomizer = randomizer
+        self.step_ms = step_ms
+        self.max_steps = max_steps
+        self.n_actions = action_count(mode)
+
+        # ---------- 預先配置的 buffer（之後只原地覆寫）----------
+        size = observation_size(preview)
+        self.obs = np.zeros(size, np.int8) if buffer is None else buffer
+        if self.obs.shape != (size,) or self.obs.dtype != np.int8:
+            raise ValueError(f"buffer must be int8 with shape ({size},)")
+        cells = BOARD_ROWS * BOARD_COLS
+        self.board = self.obs[:cells].reshape(BOARD_ROWS, BOARD_COLS)     # 皆為 view
+        self.heights = self.obs[cells:cells + BOARD_COLS]
+        self.pieces = self.obs[cells + BOARD_COLS:]
+        self.action_mask = np.zeros(self.n_actions, bool) if mask_buffer is None else mask_buffer
+        self._rows = np.zeros(BOARD_ROWS, np.int32)
+        self._bits = np.zeros((BOARD_ROWS, BOARD_COLS), np.int32)
+        self._occupied = np.zeros((BOARD_ROWS, BOARD_COLS), bool)
+        self._targets = [None] * self.n_actions if mode == PLACEMENT else None
+        self.info = {"score": 0, "lines": 0, "pieces": 0, "steps": 0}
+
+        self.state = None
+        self.steps = 0
+
+    # ---------- gym API ----------
+    def reset(self, seed=None):
+        self.state = engine.GameState(difficulty=self.difficulty, seed=seed, randomizer=self.randomizer,
+                                      preview_count=max(1, self.preview))
+        self.steps = 0
+        self._observe()
+        return self.obs, self._info()
+
+    def step(self, action):
+        state = self.state
+        before = state.score
+        if self.mode == PLACEMENT:
+            target = self._targets[action] if 0 <= action < self.n_actions else None
+            if target is None:
+                raise ValueError(f"placement {action} is not reachable (see action_mask)")
+            use_hold, placement = target
+            if use_hold:
+                state.step(engine.HOLD)
+            for a in placement.actions:
+                state.step(a)
+        else:
+            if not 0 <= action <= NOOP:
+                raise ValueError(f"unknown key action: {action!r}")
+            if action != NOOP:
+                state.step(engine.ACTIONS[action])
+            state.tick(self.step_ms)
+        state.drain_events()
+        self.steps += 1
+
+        self._observe()
+        truncated = self.max_steps is not None and self.steps >= self.max_steps and not state.over
+        return self.obs, state.score - before, state.over, truncated, self._info()
+
+    # ---------- 觀察值 ----------
+    def _observe(self):
+        state = self.state
+        rows, occupied = self._rows, self._occupied
+        rows[:] = state.board.rows
+        np.bitwise_and(rows[:, None], _BITS, out=self._bits)
+        np.not_equal(self._bits, 0, out=occupied)
+        np.copyto(self.board, occupied, casting="unsafe")
+
+        # 欄高 = ROWS − 最上方佔用格的列（空欄為 0），由 Board 增量維護
+        self.heights[:] = state.board.stats().heights
+
+        pieces = self.pieces
+        pieces[0] = _SHAPE_INDEX[state.current.shape_key]
+        pieces[1] = _SHAPE_INDEX[state.hold_piece.shape_key] if state.hold_piece else -1
+        for i, p in enumerate(state.previews[:self.preview]):
+            pieces[2 + i] = _SHAPE_INDEX[p.shape_key]
+
+        if self.mode == PLACEMENT:
+            self._update_placements()
+
+    def _update_placements(self):
+        """重新計算每個落點動作對應的路徑與 action_mask（同欄 / 同旋轉取最高處，即直接落下的位置）。"""
+        state, targets, mask = self.state, self._targets, self.action_mask
+        mask[:] = False
+        for i in range(len(targets)):
+            targets[i] = None
+        if state.over:
+            return
+        for use_hold, piece in self._candidates():
+            base = 4 * BOARD_COLS if use_hold else 0
+            for pl in ai.placements(state.board, piece):
+                a = base + pl.r * BOARD_COLS + pl.x + ROTATIONS[pl.shape][pl.r].left
+                if targets[a] is None or pl.y < targets[a][1].y:
+                    targets[a] = (use_hold, pl)
+                    mask[a] = True
+
+    def _candidates(self):
+        state = self.state
+        yield False, state.current
+        if state.hold_locked:
+            return
+        # 與 GameState.hold 相同：換出來的方塊保留原本的旋轉狀態，放回出生位置
+        src = state.hold_piece if state.hold_piece is not None else state.next_piece
+        piece = Tetromino(src.shape_key)
+        piece.r = src.r if state.hold_piece is not None else 0
+        piece.x = BOARD_COLS // 2 - len(piece.matrix[0]) // 2
+        piece.y = -2
+        yield True, piece
+
+    def _info(self):
+        info, state = self.info, self.state
+        info["score"], info["lines"], info["pieces"], info["steps"] = state.score, state.lines, state.pieces, self.steps
+        return info
+
+
+class VectorEnv:
+    """N 個 TetrisEnv，觀察值 / mask / reward 都放在共用的 (N, ...) 陣列裡。
+
+    結束（terminated 或 truncated）的環境在 step() 內自動 reset；該步回傳的是新局的觀察值與 info，
+    結束那一局的 info 與觀察值（複本）放在該環境 info 的 "final_info" / "final_observation"。
+    回傳的 info 都是複本，不會被之後的 step() 改寫。
+    """
+
+    def __init__(self, n, mode=PLACEMENT, preview=1, **kwargs):
+        self.n = n
+        size = observation_size(preview)
+        self.n_actions = action_count(mode)
+        self.obs = np.zeros((n, size), np.int8)
+        self.action_mask = np.zeros((n, self.n_actions), bool)
+        self.envs = [TetrisEnv(mode, preview, buffer=self.obs[i], mask_buffer=self.action_mask[i], **kwargs)
+                     for i in range(n)]
+        self.rewards = np.zeros(n, np.int64)
+        self.terminated = np.zeros(n, bool)
+        self.truncated = np.zeros(n, bool)
+        self.episodes = [0] * n
+        self._seed = None
+
+    def reset(self, seed=None):
+        """seed 有值時第 i 個環境第 k 局的 seed = seed + i + N * k，可完整重現。"""
+        self._seed = seed
+        self.episodes = [0] * self.n
+        for i, env in enumerate(self.envs):
+            env.reset(None if seed is None else seed + i)
+        return self.obs, [dict(env.info) for env in self.envs]
+
+    def step(self, actions):
+        infos = []
+        for i, env in enumerate(self.envs):
+            obs, reward, term, trunc, info = env.step(int(actions[i]))
+            self.rewards[i], self.terminated[i], self.truncated[i] = reward, term, trunc
+            if term or trunc:
+                final_info, final_obs = dict(info), obs.copy()    # reset 會原地覆寫
+                self.episodes[i] += 1
+                env.reset(None if self._seed is None else self._seed + i + self.n * self.episodes[i])
+                info = dict(env.info, final_info=final_info, final_observation=final_obs)
+            else:
+                info = dict(info)
+            infos.append(info)
+        return self.obs, self.rewards, self.terminated, self.truncated, infos
@@ -1,41 +1,113 @@
-import pygame, sys, os, random
+import time
+_IMPORT_START = time.perf_counter()       # --profile-startup：從載入模組開始計時
+import pygame, sys, os, random, argparse, threading
+from collections import deque
 import settings as cfg
 from settings import *
 import tetromino
-from tetromino import random_tetromino
-from board import Board
-from ui import MenuUI, SettingUI
+from ui import MenuUI, SettingUI, TEXT
+
+import ai
+import assets
+import engine
+import replay
+from engine import GameState
+from clock import RealClock
+from controls import InputPipeline
+from profiler import PhaseTimer, FrameProfiler
 
 # --------- 參數 ---------
 DAS_DELAY, ARR_SPEED = 200, 40        # 移動充電 / 重複輸入
-LOCK_DELAY           = 500            # ms
-INITIAL_FALL_DELAY   = 1000           # 等級 0 自然落下
-
-class TetrisGame:
-    def __init__(self):
-        pygame.init(); pygame.mixer.init()
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption("Tetris")
-        self.clock = pygame.time.Clock()
+LOCK_DELAY           = engine.LOCK_DELAY
+INITIAL_FALL_DELAY   = engine.INITIAL_FALL_DELAY
+BOT_ACTION_MS        = 25             # Bot 每個輸入之間的間隔
+REPLAY_SEEK_MS       = 5000           # 重播時 ← / → 一次跳幾毫秒
 
-        # 方塊圖
-        tetromino.BLOCK_IMAGES = tetromino.load_block_images()
+# 預覽框裡的方塊尺寸（hold / next 大框、後續 next 小框），載入圖片時一併預先縮放
+PREVIEW_CELL_SIZES   = ((SIDE_PANEL_PX - 20 - 10) // 4, (SIDE_PANEL_PX // 2 - 10) // 4)
 
-        # 音樂
+class TetrisGame:
+    def __init__(self, clock=None, replay_path=None, profile=None, profile_frames=False):
+        # 先開視窗、顯示選單；音效檔在背景執行緒載入，方塊圖第一次開局時才載入
+        self.profile = profile or PhaseTimer(enabled=False)
+        with self.profile.phase("display"):
+            pygame.display.init(); pygame.font.init()
+            self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+            pygame.display.set_caption("Tetris")
+        self.clock = clock or RealClock()     # VirtualClock → 不等待真實時間
+
+        # 音樂 / 音效（load_sounds 完成前為 None，播放時會略過）
         self.music_list, self.music_idx = MUSIC_FILES, 0
-        pygame.mixer.music.set_endevent(pygame.USEREVENT + 1)
-        self.play_music()
+        self.sfx_put = self.sfx_clear = None
+        self.audio_thread = None
+        self.init_audio()
 
-        # 音效
-        sfx_dir = os.path.join(os.path.dirname(__file__), "Sound_effect")
-        self.sfx_put   = pygame.mixer.Sound(os.path.join(sfx_dir, "put_on_top.mp3"))
-        self.sfx_clear = pygame.mixer.Sound(os.path.join(sfx_dir, "break.mp3"))
+        self.init_render_state(profile_frames)
 
-        self.keys = DEFAULT_KEYS
+        self.keys = cfg.DEFAULT_KEYS
+        if replay_path:
+            self.play_replay(replay_path)
+            self.shutdown(); return
         self.run_menu()
 
+    def init_render_state(self, profile_frames=False):
+        """繪圖快取與 profiler（benchmarks 也用它建立不跑選單的 renderer）。"""
+        # 繪圖快取（已固定格子的圖層 + 上一幀畫過的區域）
+        self.board_layer = None
+        self.layer_board, self.layer_version = None, -1
+        self.piece_key, self.piece_rect = None, pygame.Rect(0, 0, 0, 0)
+        self.ghost_rect = pygame.Rect(0, 0, 0, 0)
+        self.ghost_images = {}                 # 顏色 id → 半透明的方塊圖
+        self.panel_key = None
+        self.extra_dirty = []
+        self.full_redraw = True
+
+        # 每幀效能量測（F3 疊加顯示、F4 匯出）；熱點函式只在開啟時才加上計數
+        self.prof = FrameProfiler(("input", "update", "bot", "render", "panels", "display"))
+        self.prof.enable(profile_frames)
+        self.overlay, self.overlay_time = None, None
+
+    # ---------- 延遲載入 ----------
+    def init_audio(self):
+        """主執行緒開啟音訊裝置並開始播放音樂（mixer 不是執行緒安全的），音效檔交給背景執行緒載入。"""
+        with self.profile.phase("mixer"):
+            try:
+                pygame.mixer.init()
+            except pygame.error:               # 沒有音訊裝置 → 不播放聲音
+                return
+            pygame.mixer.music.set_endevent(pygame.USEREVENT + 1)
+        with self.profile.phase("music"):
+            self.play_music()
+        self.audio_thread = threading.Thread(target=self.load_sounds, name="audio", daemon=True)
+        self.audio_thread.start()
+
+    def load_sounds(self):
+        """背景執行緒：解碼（或從快取讀回）音效。"""
+        with self.profile.phase("sound effects"):
+            sfx_dir = os.path.join(os.path.dirname(__file__), "Sound_effect")
+            self.sfx_put   = assets.load_sound(os.path.join(sfx_dir, "put_on_top.mp3"))
+            self.sfx_clear = assets.load_sound(os.path.join(sfx_dir, "break.mp3"))
+
+    def wait_audio(self):
+        """需要確定音效已載入（或要關閉 pygame）之前先等背景執行緒結束。"""
+        if self.audio_thread:
+            self.audio_thread.join()
+            self.audio_thread = None
+
+    def shutdown(self):
+        """關閉 pygame；背景執行緒可能還在載入音效，先等它結束。"""
+        self.wait_audio()
+        pygame.quit()
+
+    def load_sprites(self):
+        if tetromino.BLOCK_IMAGES is None:
+            with self.profile.phase("sprites"):
+                tetromino.BLOCK_IMAGES = tetromino.load_block_images(PREVIEW_CELL_SIZES)
+
     # ---------- 音樂 ----------
     def play_music(self):
+        if not pygame.mixer.get_init():
+            return
         if not self.music_list or not cfg.MUSIC_ON:
             pygame.mixer.music.stop(); return
         pygame.mixer.music.load(self.music_list[self.music_idx])
@@ -44,209 +116,192 @@ class TetrisGame:
 
     # ---------- 主流程 ----------
     def run_menu(self):
-        menu = MenuUI(self.screen)
+        with self.profile.phase("menu"):
+            menu = MenuUI(self.screen)
+        with self.profile.phase("first frame"):
+            menu.draw()
+        self.profile.mark("menu visible")
+        if self.profile.enabled:
+            self.wait_audio()
+            self.profile.mark("audio ready")
+            self.profile.report()
+
         while True:
             opt = menu.run()
-            if opt == 0: self.start_game()
-            elif opt == 1: SettingUI(self.screen, self.keys).run()
-            else: pygame.quit(); sys.exit()
+            if opt == MenuUI.START: self.start_game()
+            elif opt == MenuUI.DEMO: self.start_game(bot=True)
+            elif opt == MenuUI.SETTINGS: SettingUI(self.screen, self.keys).run()
+            else: self.shutdown(); sys.exit()
 
     # ---------- 開啟一局 ----------
-    def start_game(self):
-        self.board = Board()
-        self.current, self.next_piece = random_tetromino(), random_tetromino()
-        self.hold_piece, self.hold_locked = None, False
-
-        # 計分參數
-        self.score = 0
-        self.lines = 0
-        self.level = 0
-        self.b2b   = False      # Back-to-Back 旗標
-
-        # 時間控制
-        self.fall_delay = INITIAL_FALL_DELAY
-        self.drop_timer = pygame.time.get_ticks()
-        self.lock_timer = None
-
-        # 輸入狀態
-        self.move_dir = self.das_timer = self.arr_timer = 0
-        self.down_pressed = False
-        self.down_start   = 0
-        self.down_delay   = 120
-
-        self.spawn_piece()
-        self.in_game = True
-
-        self.flash_points      = 0       # 這次清行得到多少分
-        self.flash_start_time  = 0       # 開始顯示的時間戳
-        self.flash_duration_ms = 1500    # 顯示 1.5 秒
+    def start_game(self, bot=False):
+        self.load_sprites()
+        self.state = GameState(difficulty=cfg.DIFFICULTY, seed=random.randrange(2 ** 32))
+        self.recorder = replay.Recorder(self.state) if cfg.RECORD_REPLAYS and not bot else None
 
-        self.game_loop()
+        # 輸入（帶時間戳的按鍵佇列＋DAS / ARR；Demo 中按鍵只用來離開）
+        self.input = InputPipeline(self.clock, self.keys, DAS_DELAY, ARR_SPEED, capture=not bot)
 
-    # ---------- 產生新方塊 ----------
-    def spawn_piece(self):
-        self.current, self.next_piece = self.next_piece, random_tetromino()
-        self.current.x = BOARD_COLS//2 - len(self.current.matrix[0])//2
-        self.current.y = -2
-        self.current.rotated = False
-        self.hold_locked = False
-        if not self.board.valid_position(self.current):
-            self.game_over()
-
-    # ---------- HOLD ----------
-    def hold(self):
-        if self.hold_locked: return
-        if self.hold_piece is None:
-            self.hold_piece = self.current; self.spawn_piece()
-        else:
-            self.current, self.hold_piece = self.hold_piece, self.current
-            self.current.x = BOARD_COLS//2 - len(self.current.matrix[0])//2
-            self.current.y = -2
-            self.current.rotated = False
-        self.hold_locked = True
-
-    # ---------- DROP ----------
-    def hard_drop(self):
-        while self.board.valid_position(self.current, dy=1):
-            self.current.y += 1
-        self.lock_piece()
-
-    # ---------- 鎖入 ----------
-    def lock_piece(self):
-        cleared = self.board.lock_piece(self.current)     # -1 = game over
-        if cleared == -1:
-            self.game_over(); return
-
-        if cfg.SFX_ON and self.sfx_put:   self.sfx_put.play()
-        if cleared and cfg.SFX_ON and self.sfx_clear: self.sfx_clear.play()
-
-        # ----- T-Spin 判定（簡化） -----
-        is_tspin = (
-            getattr(self.current, "name", "") == "T"
-            and self.current.rotated
-            and cleared > 0
-        )
-
-        self.update_score(cleared, is_tspin)
-        self.spawn_piece()
-
-    # ---------- 計分 ----------
-    def update_score(self, cleared, is_tspin):
-        if cleared == 0:
-            self.b2b = False
-            return
-
-        level_mul = self.level + 1
-        difficult = False
-        points    = 0
-
-        if is_tspin and cleared == 2:            # T-Spin Double
-            points = 12 * level_mul
-            difficult = True
-        elif is_tspin and cleared == 3:          # T-Spin Triple
-            points = 36 * level_mul
-            difficult = True
-        elif cleared == 4:                       # Tetris
-            points = 8 * level_mul
-            difficult = True
-        else:                                    # 一般單/雙/三消
-            points = {1: 1, 2: 3, 3: 5}[cleared] * level_mul
-
-        # Back-to-Back 加成
-        if difficult and self.b2b:
-            points = int(points * 1.5)           # +50 %
-        self.score += points
-
-        # 更新 B2B 狀態
-        self.b2b = difficult
-
-        # 升級
-        self.lines += cleared
-        if self.lines // 10 > self.level:
-            self.level += 1
-
-        # -------- Back-to-Back 與升級計算都做完後 ----------
-        self.flash_points     = points         # 記下剛才拿到的分數
-        self.flash_start_time = pygame.time.get_ticks()
-
-    # ---------- ROTATE / MOVE ----------
-    def rotate(self, dir=1):
-        if self.current.rotate(dir, self.board):
-            self.lock_timer = None
-            self.current.rotated = True
-
-    def move(self, dx):
-        if self.board.valid_position(self.current, dx=dx):
-            self.current.x += dx
-            self.lock_timer = None
-
-    # ---------- SOFT DROP ----------
-    def soft_drop(self):
-        if self.board.valid_position(self.current, dy=1):
-            self.current.y += 1
-            self.lock_timer = None
-        else:
-            now = pygame.time.get_ticks()
-            if self.lock_timer is None:
-                self.lock_timer = now
-            elif now - self.lock_timer >= LOCK_DELAY:
-                self.lock_piece()
+        # Bot / Demo 模式
+        self.bot = bot
+        self.bot_actions = deque()
+        self.bot_piece = None
+        self.bot_timer = 0
+        self.bot_table = ai.TranspositionTable() if bot else None
 
-    # ---------- 主迴圈 ----------
-    def game_loop(self):
+        self.in_game = True
+        self.invalidate()
+        self.game_loop()
+        if self.recorder:
+            self.save_replay()
+
+    # ---------- 重播 ----------
+    def save_replay(self):
+        os.makedirs(cfg.REPLAY_DIR, exist_ok=True)
+        name = time.strftime("replay_%Y%m%d_%H%M%S") + replay.EXTENSION
+        self.recorder.save(self.state, os.path.join(cfg.REPLAY_DIR, name))
+        self.recorder = None
+
+    def play_replay(self, path):
+        """播放重播：SPACE 暫停、← / → 跳轉、↑ / ↓ 調整速度、ESC 離開。"""
+        self.load_sprites()
+        player = replay.Player(replay.Replay.load(path))
+        self.state = player.state
+        t, speed, paused = 0, 1.0, False
+        self.in_game = True
+        self.invalidate()
         while self.in_game:
             dt = self.clock.tick(FPS)
+            seek = None
             for e in pygame.event.get():
-                if e.type == pygame.QUIT: pygame.quit(); sys.exit()
+                if e.type == pygame.QUIT: self.shutdown(); sys.exit()
                 if e.type == pygame.USEREVENT + 1: self.play_music()
-
-                # ---------- KEYDOWN ----------
                 if e.type == pygame.KEYDOWN:
-                    if e.key == self.keys["LEFT"]:
-                        self.move_dir = -1; self.move(-1); self.das_timer = self.arr_timer = pygame.time.get_ticks()
-                    elif e.key == self.keys["RIGHT"]:
-                        self.move_dir = 1;  self.move(1);  self.das_timer = self.arr_timer = pygame.time.get_ticks()
-                    elif e.key == self.keys["DOWN"]:
-                        self.down_pressed = True
-                        self.down_start = pygame.time.get_ticks()
-                        self.down_delay = 120
-                    elif e.key == self.keys["ROTATE"]:
-                        self.rotate()
-                    elif e.key == self.keys["HARD_DROP"]:
-                        self.hard_drop()
-                    elif e.key == self.keys["HOLD"]:
-                        self.hold()
-                    elif e.key == pygame.K_ESCAPE:
-                        self.in_game = False  # 返回主選單
-                        break
-
-                # ---------- KEYUP ----------
-                if e.type == pygame.KEYUP:
-                    if e.key in (self.keys["LEFT"], self.keys["RIGHT"]):
-                        self.move_dir = 0
-                    if e.key == self.keys["DOWN"]:
-                        self.down_pressed = False
-
-            # ---------- DAS / ARR ----------
-            if self.move_dir:
-                now = pygame.time.get_ticks()
-                if now - self.das_timer >= DAS_DELAY and now - self.arr_timer >= ARR_SPEED:
-                    self.move(self.move_dir)
-                    self.arr_timer = now
-
-            # ---------- 自然下落 ----------
-            now = pygame.time.get_ticks()
-            base_delay = {"Easy": 1500, "Normal": 800, "Hard": 200}.get(cfg.DIFFICULTY, 1500)
-            self.fall_delay = max(50, int(base_delay * (0.85 ** self.level)))
-            delay = self.fall_delay
-            if self.down_pressed:
-                held = now - self.down_start
-                self.down_delay = max(20, 120 - (held // 200) * 10)
-                delay = self.down_delay
-            if now - self.drop_timer > delay:
-                self.soft_drop(); self.drop_timer = now
+                    if e.key == pygame.K_ESCAPE: self.in_game = False
+                    elif e.key == pygame.K_SPACE: paused = not paused
+                    elif e.key == pygame.K_LEFT:  seek = t - REPLAY_SEEK_MS
+                    elif e.key == pygame.K_RIGHT: seek = t + REPLAY_SEEK_MS
+                    elif e.key == pygame.K_UP:    speed = min(16.0, speed * 2)
+                    elif e.key == pygame.K_DOWN:  speed = max(0.25, speed / 2)
+
+            if seek is not None:
+                t = max(0, min(seek, player.replay.end_time))
+                player.seek(t)
+            elif not paused:
+                t = min(t + dt * speed, player.replay.end_time)
+                player.advance_to(int(t))
+            self.state = player.state
+            self.state.drain_events()
 
             self.render()
+            label = f"REPLAY {t / 1000:6.1f}s x{speed:g}" + ("  PAUSED" if paused else "")
+            img = TEXT.render(label, (255, 220, 0), 21)
+            rect = self.screen.blit(img, (BOARD_OFFSET_X + 6, BOARD_OFFSET_Y + 6))
+            pygame.display.update(rect)
+            self.mark_dirty(rect)
+
+    # ---------- 引擎事件 ----------
+    def handle_events(self):
+        for name, value in self.state.drain_events():
+            if name == "lock":
+                if cfg.SFX_ON and self.sfx_put:   self.sfx_put.play()
+                if value and cfg.SFX_ON and self.sfx_clear: self.sfx_clear.play()
+            elif name == "game_over":
+                self.game_over()
+
+    # ---------- 主迴圈 ----------
+    def game_loop(self):
+        """輸入在等待下一幀時持續輪詢並記下時間戳；遊戲邏輯以固定的 LOGIC_HZ 步進
+        （accumulator），與畫面更新率無關。落後太多時最多補 MAX_LOGIC_STEPS 步，其餘時間直接捨棄。"""
+        step_ms, frame_ms = 1000 / cfg.LOGIC_HZ, 1000 / FPS
+        self.logic_ms = float(self.state.time_ms)
+        self.input.sync(self.state)
+        frame_start = self.clock.now()
+        acc = 0.0
+        while self.in_game:
+            self.input.pump_until(frame_start + frame_ms)
+            self.instrument_state()
+            self.prof.frame()
+            now = self.clock.now()
+            acc += now - frame_start
+            frame_start = now
+            with self.prof.section("input"):
+                self.poll_input()
+
+            steps = 0
+            while self.in_game and acc >= step_ms and steps < cfg.MAX_LOGIC_STEPS:
+                with self.prof.section("update"):
+                    self.update(step_ms)
+                acc -= step_ms
+                steps += 1
+            if steps == cfg.MAX_LOGIC_STEPS and acc > step_ms:
+                self.input.drop(acc - step_ms)    # frame-skip 上限：放棄追不上的時間
+                acc = step_ms
+
+            if self.in_game:
+                with self.prof.section("render"):
+                    self.render(acc / step_ms)
+                self.input.presented()
+
+    def instrument_state(self):
+        """熱點計數只掛在這一局的 GameState / Board 實例上（換局或盤面重建時改掛）。"""
+        state, prof = self.state, self.prof
+        prof.instrument(state, "soft_drop", timed=True)
+        prof.instrument(state, "lock_piece", timed=True)
+        prof.instrument(state.board, "valid_position")
+
+    def poll_input(self):
+        """遊戲按鍵已由 self.input 排隊；這裡處理其餘事件。"""
+        for e in self.input.drain():
+            if e.type == pygame.QUIT: self.shutdown(); sys.exit()
+            if e.type == pygame.USEREVENT + 1: self.play_music()
+            if e.type == pygame.KEYDOWN and e.key == pygame.K_F3:
+                self.toggle_profiler(); continue
+            if e.type == pygame.KEYDOWN and e.key == pygame.K_F4:
+                self.export_profile(); continue
+
+            # Demo 中任意鍵 → 返回主選單
+            if self.bot:
+                if e.type in (pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN):
+                    self.in_game = False
+                    break
+                continue
+
+            if e.type == pygame.KEYDOWN and e.key == pygame.K_ESCAPE:
+                self.in_game = False  # 返回主選單
+                break
+
+    def update(self, step_ms):
+        """一個固定長度的邏輯步：按鍵 / DAS / ARR 在各自的精確時間點套用，重力 / 鎖定延遲，Bot、引擎事件。"""
+        t = self.logic_ms + step_ms
+        self.input.advance(self.state, int(t))    # 引擎時間維持整數毫秒，小數部分留在 logic_ms
+        self.logic_ms = t
+
+        if self.bot:
+            with self.prof.section("bot"):
+                self.bot_update()
+
+        self.handle_events()
+
+    # ---------- BOT ----------
+    def bot_update(self):
+        state = self.state
+        if state.over:
+            return
+        # 換了新方塊（或被重力鎖定）→ 重新規劃
+        if state.current is not self.bot_piece:
+            self.bot_piece = state.current
+            move = ai.state_move(state, table=self.bot_table)
+            self.bot_actions = deque(move.actions if move else ())
+
+        now = state.time_ms
+        if self.bot_actions and now - self.bot_timer >= BOT_ACTION_MS:
+            action = self.bot_actions.popleft()
+            if not state.step(action) and action != engine.SOFT_DROP:
+                self.bot_piece = None          # 路徑失效（例如被重力推下）→ 下一幀重算
+            elif action == engine.HOLD:
+                self.bot_piece = state.current # 路徑已包含 HOLD 之後的動作
+            self.bot_timer = now
 
     # ---------- 繪圖 ----------
     def draw_side_panels(self):
@@ -257,50 +312,63 @@ class TetrisGame:
         n_box = pygame.Rect(SCREEN_WIDTH - SIDE_PANEL_PX + 10, 10, SIDE_PANEL_PX - 20, SIDE_PANEL_PX - 20)
         for b in (h_box, n_box): pygame.draw.rect(self.screen, (255, 255, 255), b, 3)
 
-        if self.hold_piece: self.draw_preview(self.hold_piece, h_box)
-        self.draw_preview(self.next_piece, n_box)
+        state = self.state
+        if state.hold_piece: self.draw_preview(state.hold_piece, h_box)
+        previews = state.previews
+        self.draw_preview(previews[0], n_box)
+
+        # 之後的 next 方塊：較小的框依序往下排
+        q_size = SIDE_PANEL_PX // 2
+        q_y = n_box.bottom + 10
+        for piece in previews[1:]:
+            q_box = pygame.Rect(n_box.centerx - q_size // 2, q_y, q_size, q_size)
+            pygame.draw.rect(self.screen, (120, 120, 120), q_box, 1)
+            self.draw_preview(piece, q_box)
+            q_y += q_size + 6
 
         #顯示分數
-        font = pygame.font.SysFont(None, 21)
-        info_y = n_box.bottom + 30
-        for txt in (f"Score : {self.score}", f"Level : {self.level}"):
-            self.screen.blit(font.render(txt, True, (255, 255, 255)),
+        info_y = q_y + 20
+        for txt in (f"Score : {state.score}", f"Level : {state.level}"):
+            self.screen.blit(TEXT.render(txt, (255, 255, 255), 21),
                              (SCREEN_WIDTH - SIDE_PANEL_PX + 10, info_y))
             info_y += 30
 
-        # 說明文字
-        font = pygame.font.SysFont(None, 18)
-        guide_y = 100
-        lines = [
-            "Normal",
-            "1Line : 1",
-            "2Line : 3",
-            "3Line : 5",
-            "4Line : 8",
-            "",
-            "T-Spin",
-            "Double : 12",
-            "Triple : 36",
-            "",
-            "BTB : + 50%"
-        ]
-        for line in lines:
-            self.screen.blit(font.render(line, True, (200, 200, 200)), (10, guide_y))
-            guide_y += 25
+        # 說明文字（靜態，只點陣化一次）
+        self.screen.blit(self.guide_surface(), (10, 100))
 
         # --- 閃現分數 ---
-        now = pygame.time.get_ticks()
-        if self.flash_points and now - self.flash_start_time <= self.flash_duration_ms:
-            flash_txt = f"+{self.flash_points}"
-            flash_font = pygame.font.SysFont(None, 24, bold=True)
+        if state.flash_visible(self.render_ms):
+            flash_txt = f"+{state.flash_points}"
 
             # 放在 Score 下面再往右邊縮一點，避免文字重疊
             self.screen.blit(
-                flash_font.render(flash_txt, True, (255, 220, 0)),
+                TEXT.render(flash_txt, (255, 220, 0), 24, bold=True),
                 (SCREEN_WIDTH - SIDE_PANEL_PX + 40, info_y)   # info_y 是上一段邏輯累加後的位置
             )
-        else:
-            self.flash_points = 0       # 時間到 → 清空
+
+    GUIDE_LINES = [
+        "Normal",
+        "1Line : 1",
+        "2Line : 3",
+        "3Line : 5",
+        "4Line : 8",
+        "",
+        "T-Spin",
+        "Double : 12",
+        "Triple : 36",
+        "",
+        "BTB : + 50%"
+    ]
+
+    def guide_surface(self):
+        surf = getattr(self, "_guide_surface", None)
+        if surf is None:
+            surf = pygame.Surface((SIDE_PANEL_PX - 10, 25 * len(self.GUIDE_LINES)), pygame.SRCALPHA)
+            for i, line in enumerate(self.GUIDE_LINES):
+                if line:
+                    surf.blit(TEXT.render(line, (200, 200, 200), 18), (0, i * 25))
+            self._guide_surface = surf
+        return surf
 
     def draw_preview(self, piece, box):
         s = (box.width - 10) // 4
@@ -309,33 +377,192 @@ class TetrisGame:
         for r, row in enumerate(piece.matrix):
             for c, v in enumerate(row):
                 if v:
-                    img = pygame.transform.scale(tetromino.BLOCK_IMAGES[v], (s, s))
-                    self.screen.blit(img, (ox + c * s, oy + r * s))
-
-    def render(self):
-        self.screen.fill((0, 0, 0))
-        self.board.draw(self.screen, BOARD_OFFSET_X, BOARD_OFFSET_Y)
-        for x, y, v in self.current.get_cells():
+                    self.screen.blit(tetromino.BLOCK_IMAGES.get(v, s), (ox + c * s, oy + r * s))
+
+    BOARD_RECT  = pygame.Rect(BOARD_OFFSET_X, BOARD_OFFSET_Y, BOARD_WIDTH_PX, BOARD_HEIGHT_PX)
+    FRAME_RECT  = pygame.Rect(SIDE_PANEL_PX, 18.3, BOARD_WIDTH_PX, BOARD_HEIGHT_PX + 10.5)
+    PANEL_RECTS = (pygame.Rect(0, 0, SIDE_PANEL_PX, SCREEN_HEIGHT),
+                   pygame.Rect(SCREEN_WIDTH - SIDE_PANEL_PX, 0, SIDE_PANEL_PX, SCREEN_HEIGHT))
+
+    def invalidate(self):
+        """下一幀整個畫面重畫（進入遊戲、換畫面之後）。"""
+        self.full_redraw = True
+
+    def mark_dirty(self, rect):
+        """rect 被蓋過（例如重播字幕），下一幀要從快取重畫。"""
+        self.extra_dirty.append(pygame.Rect(rect))
+
+    def draw_board_layer(self, board):
+        """已固定的格子畫在獨立的圖層上，只有盤面 version 改變（lock / 消行）時才重畫。"""
+        if self.board_layer is None:
+            self.board_layer = pygame.Surface((BOARD_WIDTH_PX, BOARD_HEIGHT_PX)).convert()
+        self.board_layer.fill((0, 0, 0))
+        board.draw(self.board_layer, 0, 0)
+        self.layer_board, self.layer_version = board, board.version
+
+    def draw_piece(self, piece):
+        rect = None
+        for x, y, v in piece.get_cells():
             if y >= 0:
-                self.screen.blit(tetromino.BLOCK_IMAGES[v],
-                                 (BOARD_OFFSET_X + x * CELL_SIZE, BOARD_OFFSET_Y + y * CELL_SIZE))
-        self.draw_side_panels()
-        pygame.draw.rect(self.screen, (255, 255, 255),
-                         pygame.Rect(SIDE_PANEL_PX, 18.3, BOARD_WIDTH_PX, BOARD_HEIGHT_PX + 10.5), 3)
-        pygame.display.flip()
+                r = self.screen.blit(tetromino.BLOCK_IMAGES[v],
+                                     (BOARD_OFFSET_X + x * CELL_SIZE, BOARD_OFFSET_Y + y * CELL_SIZE))
+                rect = r if rect is None else rect.union(r)
+        return rect or pygame.Rect(0, 0, 0, 0)
+
+    def draw_ghost(self, piece, ghost_y):
+        """在落點畫半透明的方塊；與目前方塊重疊（已著地）時不畫。"""
+        dy = ghost_y - piece.y
+        if not cfg.GHOST_PIECE or dy <= 0:
+            return pygame.Rect(0, 0, 0, 0)
+        rect = None
+        for x, y, v in piece.get_cells():
+            y += dy
+            if y >= 0:
+                img = self.ghost_images.get(v)
+                if img is None:
+                    img = self.ghost_images[v] = tetromino.BLOCK_IMAGES[v].copy()
+                    img.set_alpha(cfg.GHOST_ALPHA)
+                r = self.screen.blit(img, (BOARD_OFFSET_X + x * CELL_SIZE, BOARD_OFFSET_Y + y * CELL_SIZE))
+                rect = r if rect is None else rect.union(r)
+        return rect or pygame.Rect(0, 0, 0, 0)
+
+    def render(self, alpha=0.0):
+        """只重畫變動的區域，最後用 display.update(rects) 推上螢幕。
+        alpha：距離下一個邏輯步的比例，時間相關的效果（閃現分數）以插值後的時間判斷。"""
+        state, screen = self.state, self.screen
+        self.render_ms = state.time_ms + alpha * 1000 / cfg.LOGIC_HZ
+        board, piece = state.board, state.current
+
+        layer_changed = board is not self.layer_board or board.version != self.layer_version
+        if layer_changed:
+            self.draw_board_layer(board)
+
+        ghost_y = state.ghost_y()
+        piece_key = (piece.shape_key, piece.r, piece.x, piece.y, ghost_y)
+        panel_key = (state.hold_piece and state.hold_piece.shape_key,
+                     tuple(p.shape_key for p in state.previews),
+                     state.score, state.level,
+                     state.flash_visible(self.render_ms) and state.flash_points)
+        extra, self.extra_dirty = self.extra_dirty, []
+
+        # ---------- 整頁重畫 ----------
+        if self.full_redraw:
+            screen.fill((0, 0, 0))
+            screen.blit(self.board_layer, self.BOARD_RECT)
+            self.ghost_rect = self.draw_ghost(piece, ghost_y)
+            self.piece_rect = self.draw_piece(piece)
+            with self.prof.section("panels"):
+                self.draw_side_panels()
+            pygame.draw.rect(screen, (255, 255, 255), self.FRAME_RECT, 3)
+            self.draw_overlay()
+            self.present()
+            self.piece_key, self.panel_key, self.full_redraw = piece_key, panel_key, False
+            return
+
+        dirty = []
+
+        # ---------- 盤面：從圖層還原舊位置，再畫 ghost 與 active piece ----------
+        if layer_changed:
+            restore = [self.BOARD_RECT]
+        elif piece_key != self.piece_key or extra:
+            restore = [self.piece_rect, self.ghost_rect] + extra
+        else:
+            restore = []
+        if restore:
+            for rect in restore:
+                rect = rect.clip(self.BOARD_RECT)
+                if rect:
+                    screen.blit(self.board_layer, rect, rect.move(-BOARD_OFFSET_X, -BOARD_OFFSET_Y))
+                    dirty.append(rect)
+            self.ghost_rect = self.draw_ghost(piece, ghost_y)
+            self.piece_rect = self.draw_piece(piece)
+            dirty += (self.ghost_rect, self.piece_rect)
+            pygame.draw.rect(screen, (255, 255, 255), self.FRAME_RECT, 3)   # 框線壓在盤面邊緣上
+            self.piece_key = piece_key
+
+        # ---------- 側欄：內容有變才重畫 ----------
+        if panel_key != self.panel_key or any(r.collidelist(self.PANEL_RECTS) != -1 for r in extra):
+            with self.prof.section("panels"):
+                self.draw_side_panels()
+            dirty.extend(self.PANEL_RECTS)
+            self.panel_key = panel_key
+
+        overlay = self.draw_overlay()
+        if overlay:
+            dirty.append(overlay)
+        if dirty:
+            self.present(dirty)
+
+    def present(self, rects=None):
+        """把畫好的區域推上螢幕；screen 是離屏 Surface（capture.py）時不必更新視窗。"""
+        if self.screen is not pygame.display.get_surface():
+            return
+        with self.prof.section("display"):
+            if rects is None:
+                pygame.display.flip()
+            else:
+                pygame.display.update(rects)
+
+    # ---------- 效能疊加 ----------
+    def toggle_profiler(self):
+        if not self.prof.toggle() and self.overlay:
+            self.mark_dirty(self.overlay.get_rect(topleft=self.OVERLAY_POS))   # 關閉 → 下一幀擦掉
+        self.overlay = None
+
+    def export_profile(self):
+        os.makedirs(cfg.PROFILE_DIR, exist_ok=True)
+        base = os.path.join(cfg.PROFILE_DIR, time.strftime("frames_%Y%m%d_%H%M%S"))
+        self.prof.export(base + ".csv")
+        self.prof.export(base + ".json")
+
+    OVERLAY_POS = (BOARD_OFFSET_X + 4, BOARD_OFFSET_Y + 4)
+
+    def draw_overlay(self):
+        """畫 profiler 統計（每 PROFILE_OVERLAY_MS 重新產生一次）；回傳需要更新的區域。"""
+        if not self.prof.enabled:
+            return None
+        now = self.clock.now()
+        if self.overlay is None or now - self.overlay_time >= cfg.PROFILE_OVERLAY_MS:
+            lines = self.prof.summary_lines()
+            stats = self.input.latency_stats() if getattr(self, "input", None) else None
+            if stats and stats["count"]:
+                lines.append(f"input->display {stats['mean']:.1f}  p95 {stats['p95']} ms")
+            self.overlay = pygame.Surface((BOARD_WIDTH_PX - 8, 14 * len(lines) + 6), pygame.SRCALPHA)
+            self.overlay.fill((0, 0, 0, 170))
+            for i, line in enumerate(lines):
+                self.overlay.blit(TEXT.render(line, (120, 255, 120), 16), (4, 3 + i * 14))
+            self.overlay_time = now
+        rect = self.screen.blit(self.overlay, self.OVERLAY_POS)
+        self.mark_dirty(rect)          # 下一幀從盤面圖層還原
+        return rect
 
     # ---------- GAME OVER ----------
     def game_over(self):
-        f = pygame.font.SysFont(None, 72)
-        r = f.render("GAME OVER", True, (255, 0, 0))
+        self.render()
+        r = TEXT.render("GAME OVER", (255, 0, 0), 72)
         self.screen.blit(r, r.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)))
         pygame.display.flip()
-        pygame.time.wait(2000)
+        self.clock.wait(2000)
         self.in_game = False
 
 
-def main():  # entry
-    TetrisGame()
+def main(argv=None):  # entry
+    parser = argparse.ArgumentParser(description="Tetris")
+    parser.add_argument("--replay", metavar="FILE", help="播放錄製的重播檔")
+    parser.add_argument("--profile-startup", action="store_true", help="印出啟動各階段耗時")
+    parser.add_argument("--profile-frames", action="store_true", help="開啟每幀效能疊加（遊戲中 F3 切換、F4 匯出）")
+    parser.add_argument("--wall", metavar="N", type=int, help="觀戰牆：同時顯示 N 局 Bot（建議 16~100）")
+    parser.add_argument("--wall-replays", metavar="PATH", nargs="+", help="觀戰牆改為循環播放這些重播檔 / 資料夾")
+    args = parser.parse_args(argv)
+    if args.wall or args.wall_replays:
+        import wall
+        wall.run(args.wall, args.wall_replays or ())
+        return
+    profile = None
+    if args.profile_startup:
+        profile = PhaseTimer(start=_IMPORT_START)
+        profile.add("import", _IMPORT_START, time.perf_counter())
+    TetrisGame(replay_path=args.replay, profile=profile, profile_frames=args.profile_frames)
 
 
 if __name__ == "__main__":
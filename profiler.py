@@ -0,0 +1,255 @@
+"""效能量測工具。
+
+PhaseTimer：啟動各階段（含背景執行緒）的耗時，`python main.py --profile-startup` 會印出。
+FrameProfiler：每幀各區段耗時（互斥計算，巢狀區段不重複計入）與熱點函式呼叫次數，
+可算百分位數並匯出 CSV / JSON；遊戲中 F3 開關畫面疊加資訊、F4 匯出。
+"""
+import csv
+import functools
+import json
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+
+class PhaseTimer:
+    """with timer.phase("名稱"): ... 記錄一個階段；mark() 記錄時間點；report() 印出表格。"""
+
+    def __init__(self, enabled=True, start=None):
+        self.enabled = enabled
+        self.start = time.perf_counter() if start is None else start
+        self.phases = []                 # (名稱, 開始, 結束, 執行緒名稱)
+        self.marks = []                  # (名稱, 時間)
+        self._lock = threading.Lock()    # 背景執行緒也會寫入
+
+    @contextmanager
+    def phase(self, name):
+        if not self.enabled:
+            yield
+            return
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, t0, time.perf_counter())
+
+    def add(self, name, t0, t1):
+        if self.enabled:
+            with self._lock:
+                self.phases.append((name, t0, t1, threading.current_thread().name))
+
+    def mark(self, name):
+        if self.enabled:
+            with self._lock:
+                self.marks.append((name, time.perf_counter()))
+
+    def report(self, out=None):
+        out = out or sys.stdout
+        ms = lambda t: (t - self.start) * 1000
+        with self._lock:
+            phases, marks = sorted(self.phases, key=lambda p: p[1]), list(self.marks)
+        print(f"{'phase':<22}{'thread':<14}{'start':>9}{'ms':>9}", file=out)
+        for name, t0, t1, thread in phases:
+            print(f"{name:<22}{thread:<14}{ms(t0):>9.1f}{(t1 - t0) * 1000:>9.1f}", file=out)
+        for name, t in marks:
+            print(f"{'> ' + name:<36}{ms(t):>9.1f}", file=out)
+        out.flush()
+
+
+_NULL = nullcontext()
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+class FrameProfiler:
+    """每幀一列：frame_ms（與上一幀的間隔）、busy_ms（各區段合計）、各區段毫秒數、呼叫次數。
+
+    區段以 with prof.section(名稱) 標記，巢狀時外層會暫停計時，所以各欄相加就是 busy_ms。
+    instrument(物件, 方法名) 在開啟時才替換方法加上計數（timed=True 另外當作一個區段計時），
+    關閉時還原，平常遊玩沒有額外成本。物件為實例時只包裝該實例的方法，同一程序裡的
+    其他實例（例如 AI 搜尋或觀戰牆的對局）不受影響。
+    """
+
+    def __init__(self, sections=(), window=3600):
+        self.enabled = False
+        self.sections = list(sections)
+        self.counters = []
+        self.frames = deque(maxlen=window)
+        self._patched = []               # (物件, 方法名, 原本的方法)
+        self._stack = []                 # [區段名稱, 開始時間]
+        self._times = {}
+        self._counts = {}
+        self._frame_start = None
+
+    # ---------- 開關 ----------
+    def instrument(self, owner, name, timed=False):
+        """登記要計數的熱點函式（開啟時才真的替換）；同一名稱再登記一次會改掛到新的物件上。"""
+        for i, (old, counted, _) in enumerate(self.counters):
+            if counted == name:
+                if old is owner:
+                    return
+                self._unpatch(name)
+                self.counters[i] = (owner, name, timed)
+                break
+        else:
+            self.counters.append((owner, name, timed))
+        if timed and name not in self.sections:
+            self.sections.append(name)
+        if self.enabled:
+            self._patch(owner, name, timed)
+
+    def enable(self, on=True):
+        if on == self.enabled:
+            return
+        self.enabled = on
+        if on:
+            for owner, name, timed in self.counters:
+                self._patch(owner, name, timed)
+            self._frame_start = None
+        else:
+            for owner, name, original in reversed(self._patched):
+                self._restore(owner, name, original)
+            self._patched.clear()
+            self._stack.clear()
+
+    def toggle(self):
+        self.enable(not self.enabled)
+        return self.enabled
+
+    def _patch(self, owner, name, timed):
+        # 類別：替換類別上的函式；實例：在實例上放一個包裝 bound method 的屬性
+        original = owner.__dict__[name] if isinstance(owner, type) else getattr(owner, name)
+        counts = self._counts
+        counts.setdefault(name, 0)
+        if timed:
+            push, pop = self._push, self._pop
+
+            @functools.wraps(original)
+            def wrapper(*args, **kwargs):
+                counts[name] += 1
+                push(name)
+                try:
+                    return original(*args, **kwargs)
+                finally:
+                    pop()
+        else:
+            @functools.wraps(original)
+            def wrapper(*args, **kwargs):
+                counts[name] += 1
+                return original(*args, **kwargs)
+        setattr(owner, name, wrapper)
+        self._patched.append((owner, name, original))
+
+    def _unpatch(self, name):
+        for entry in [e for e in self._patched if e[1] == name]:
+            self._restore(*entry)
+            self._patched.remove(entry)
+
+    @staticmethod
+    def _restore(owner, name, original):
+        if isinstance(owner, type):
+            setattr(owner, name, original)
+        else:
+            del owner.__dict__[name]            # 露出類別上的方法
+
+    # ---------- 計時 ----------
+    def _push(self, name):
+        now = time.perf_counter()
+        stack = self._stack
+        if stack:
+            parent = stack[-1]
+            self._times[parent[0]] = self._times.get(parent[0], 0.0) + now - parent[1]
+        stack.append([name, now])
+
+    def _pop(self):
+        now = time.perf_counter()
+        stack = self._stack
+        if not stack:            # 區段進行中被關閉（例如在輸入處理時按 F3）
+            return
+        name, start = stack.pop()
+        self._times[name] = self._times.get(name, 0.0) + now - start
+        if stack:
+            stack[-1][1] = now
+
+    @contextmanager
+    def _section(self, name):
+        self._push(name)
+        try:
+            yield
+        finally:
+            self._pop()
+
+    def section(self, name):
+        return self._section(name) if self.enabled else _NULL
+
+    def frame(self):
+        """每幀開頭呼叫：結算上一幀並開始新的一幀。"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self._frame_start is not None:
+            times = self._times
+            row = {"frame_ms": (now - self._frame_start) * 1000,
+                   "busy_ms": sum(times.values()) * 1000}
+            for name in self.sections:
+                row[name] = times.get(name, 0.0) * 1000
+            for _, name, _ in self.counters:
+                row["calls_" + name] = self._counts.get(name, 0)
+            self.frames.append(row)
+        self._frame_start = now
+        self._times = {}
+        for name in self._counts:
+            self._counts[name] = 0
+
+    # ---------- 統計 / 匯出 ----------
+    def stats(self):
+        """各欄的 mean / p50 / p95 / p99 / max。"""
+        out = {}
+        frames = list(self.frames)
+        if not frames:
+            return out
+        for key in frames[0]:
+            values = sorted(row[key] for row in frames)
+            out[key] = {
+                "mean": sum(values) / len(values),
+                "p50": percentile(values, 0.50),
+                "p95": percentile(values, 0.95),
+                "p99": percentile(values, 0.99),
+                "max": values[-1],
+            }
+        return out
+
+    def export(self, path):
+        """副檔名 .json → 統計＋每幀資料；其他 → 每幀一列的 CSV。"""
+        frames = list(self.frames)
+        if path.endswith(".json"):
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"frames": len(frames), "stats": self.stats(), "rows": frames}, f, indent=1)
+            return path
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            if frames:
+                writer = csv.DictWriter(f, fieldnames=list(frames[0]))
+                writer.writeheader()
+                writer.writerows(frames)
+        return path
+
+    def summary_lines(self):
+        """疊加畫面用的幾行文字。"""
+        stats = self.stats()
+        if not stats:
+            return ["profiling..."]
+        ft = stats["frame_ms"]
+        lines = [f"frame p50 {ft['p50']:.1f}  p95 {ft['p95']:.1f}  p99 {ft['p99']:.1f} ms",
+                 f"busy  p50 {stats['busy_ms']['p50']:.2f}  p99 {stats['busy_ms']['p99']:.2f} ms"]
+        for name in self.sections:
+            if name in stats:
+                lines.append(f"{name:<12}{stats[name]['mean']:6.3f}  p99 {stats[name]['p99']:6.3f}")
+        for _, name, _ in self.counters:
+            lines.append(f"{name:<16}{stats['calls_' + name]['mean']:7.2f}/frame")
+        return lines
@@ -0,0 +1,275 @@
+"""精簡的二進位重播格式：seed＋設定＋帶時間戳的輸入（差值＋varint），
+並定期寫入盤面 keyframe，播放時可直接跳到任一時間點而不必從頭重新模擬。
+
+檔案結構::
+
+    b"TRPL" | version | 標頭 | 紀錄 ... | END 紀錄
+
+每筆紀錄以 varint((距上一筆的毫秒數 << 4) | 代碼) 開頭；代碼 0..8 為
+engine.ACTIONS 的索引，KEYFRAME 後接 varint 長度與快照，END 表示結束時間。
+"""
+import bisect
+
+import engine
+from engine import GameState
+from settings import BOARD_COLS, BOARD_ROWS
+from tetromino import SHAPE_KEYS
+
+MAGIC = b"TRPL"
+VERSION = 1
+EXTENSION = ".trp"
+
+KEYFRAME = 15
+END = 14
+KEYFRAME_INTERVAL_MS = 5000      # 遊戲時間每隔多久寫一個 keyframe
+
+_ACTION_CODES = {a: i for i, a in enumerate(engine.ACTIONS)}
+
+
+# ---------- varint ----------
+def write_varint(out, value):
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return
+
+
+def read_varint(data, pos):
+    """回傳 (值, 新位置)。"""
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def zigzag(n):
+    return n * 2 if n >= 0 else -n * 2 - 1
+
+
+def unzigzag(n):
+    return n >> 1 if not n & 1 else -(n >> 1) - 1
+
+
+def write_str(out, text):
+    raw = text.encode("utf-8")
+    write_varint(out, len(raw))
+    out += raw
+
+
+def read_str(data, pos):
+    n, pos = read_varint(data, pos)
+    return bytes(data[pos:pos + n]).decode("utf-8"), pos + n
+
+
+# ---------- 盤面快照 ----------
+def encode_snapshot(snap):
+    out = bytearray()
+    for name in GameState.SNAPSHOT_FIELDS:
+        value = snap[name]
+        if value is None:             # lock_timer
+            write_varint(out, 0)
+        else:
+            write_varint(out, zigzag(int(value)) + 1)
+    write_varint(out, snap["dealt"])
+    write_varint(out, snap["board_score"])
+    for name in ("current", "hold_piece"):
+        p = snap[name]
+        if p is None:
+            out.append(0)
+        else:
+            shape, r, x, y, rotated = p
+            out.append(1 + SHAPE_KEYS.index(shape))
+            out.append(r | (rotated << 2))
+            write_varint(out, zigzag(x))
+            write_varint(out, zigzag(y))
+    # 顏色 id 0..7 → 每格 4 bit，上方的空列不寫
+    grid = snap["grid"]
+    top = next((y for y, row in enumerate(grid) if any(row)), BOARD_ROWS)
+    write_varint(out, top)
+    cells = [v for row in grid[top:] for v in row]
+    for i in range(0, len(cells), 2):
+        out.append(cells[i] | (cells[i + 1] << 4 if i + 1 < len(cells) else 0))
+    return bytes(out)
+
+
+def decode_snapshot(data):
+    pos = 0
+    snap = {}
+    for name in GameState.SNAPSHOT_FIELDS:
+        raw, pos = read_varint(data, pos)
+        snap[name] = None if raw == 0 else unzigzag(raw - 1)
+    for name in ("down_pressed", "b2b", "hold_locked", "over"):
+        snap[name] = bool(snap[name])
+    snap["dealt"], pos = read_varint(data, pos)
+    snap["board_score"], pos = read_varint(data, pos)
+    for name in ("current", "hold_piece"):
+        kind = data[pos]; pos += 1
+        if not kind:
+            snap[name] = None
+            continue
+        bits = data[pos]; pos += 1
+        x, pos = read_varint(data, pos)
+        y, pos = read_varint(data, pos)
+        snap[name] = (SHAPE_KEYS[kind - 1], bits & 3, unzigzag(x), unzigzag(y), bool(bits & 4))
+    top, pos = read_varint(data, pos)
+    cells = [0] * (top * BOARD_COLS)
+    for byte in data[pos:pos + ((BOARD_ROWS - top) * BOARD_COLS + 1) // 2]:
+        cells += (byte & 0x0F, byte >> 4)
+    snap["grid"] = [cells[y * BOARD_COLS:(y + 1) * BOARD_COLS] for y in range(BOARD_ROWS)]
+    return snap
+
+
+# ---------- 錄製 ----------
+class Recorder:
+    """掛在 GameState.recorder 上，記錄每個輸入並定期寫 keyframe。"""
+
+    def __init__(self, state, keyframe_interval_ms=KEYFRAME_INTERVAL_MS):
+        self.interval = keyframe_interval_ms
+        self.buf = bytearray(MAGIC)
+        self.buf.append(VERSION)
+        seed = state.seed
+        if seed is None:
+            self.buf.append(0)
+        else:
+            self.buf.append(1)
+            write_varint(self.buf, zigzag(int(seed)))
+        write_str(self.buf, state.difficulty)
+        write_str(self.buf, state.randomizer)
+        write_varint(self.buf, state.preview_count)
+        self.last_time = state.time_ms
+        self.last_keyframe = None
+        self.finished = False
+        state.recorder = self
+
+    def _record(self, time_ms, code):
+        write_varint(self.buf, ((time_ms - self.last_time) << 4) | code)
+        self.last_time = time_ms
+
+    def record(self, state, action):
+        if self.last_keyframe is None or state.time_ms - self.last_keyframe >= self.interval:
+            snap = encode_snapshot(state.snapshot())
+            self._record(state.time_ms, KEYFRAME)
+            write_varint(self.buf, len(snap))
+            self.buf += snap
+            self.last_keyframe = state.time_ms
+        self._record(state.time_ms, _ACTION_CODES[action])
+
+    def placed(self, state, piece, cleared):
+        pass                              # 落點可由輸入重新模擬得到，不另外記錄
+
+    def finish(self, state):
+        """寫入結束時間並回傳完整內容。"""
+        if not self.finished:
+            self._record(state.time_ms, END)
+            self.finished = True
+            state.recorder = None
+        return bytes(self.buf)
+
+    def save(self, state, path):
+        with open(path, "wb") as f:
+            f.write(self.finish(state))
+
+
+# ---------- 播放 ----------
+class Replay:
+    """解析後的重播：inputs 為 [(時間, 動作)]，keyframes 為 [(時間, 輸入索引, 快照 bytes)]。"""
+
+    def __init__(self, data):
+        data = memoryview(data)
+        if bytes(data[:4]) != MAGIC:
+            raise ValueError("not a replay file")
+        if data[4] != VERSION:
+            raise ValueError(f"unsupported replay version {data[4]}")
+        pos = 5
+        self.seed = None
+        if data[pos]:
+            raw, pos = read_varint(data, pos + 1)
+            self.seed = unzigzag(raw)
+        else:
+            pos += 1
+        self.difficulty, pos = read_str(data, pos)
+        self.randomizer, pos = read_str(data, pos)
+        self.preview_count, pos = read_varint(data, pos)
+
+        self.inputs = []
+        self.keyframes = []
+        self.end_time = 0
+        t = 0
+        while pos < len(data):
+            head, pos = read_varint(data, pos)
+            t += head >> 4
+            code = head & 0x0F
+            if code == KEYFRAME:
+                n, pos = read_varint(data, pos)
+                self.keyframes.append((t, len(self.inputs), bytes(data[pos:pos + n])))
+                pos += n
+            elif code == END:
+                self.end_time = t
+                break
+            else:
+                self.inputs.append((t, engine.ACTIONS[code]))
+        if not self.end_time and self.inputs:
+            self.end_time = self.inputs[-1][0]
+        self._key_times = [k[0] for k in self.keyframes]
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls(f.read())
+
+    def new_state(self):
+        return GameState(difficulty=self.difficulty, seed=self.seed,
+                         randomizer=self.randomizer, preview_count=self.preview_count)
+
+
+class Player:
+    """依時間重新模擬重播；seek() 從最近的 keyframe 開始，不必回到開頭。"""
+
+    def __init__(self, replay):
+        self.replay = replay
+        self.state = replay.new_state()
+        self.index = 0                    # 下一個要套用的輸入
+
+    def advance_to(self, time_ms):
+        """往前模擬到 time_ms（只能往後）。"""
+        state, inputs = self.state, self.replay.inputs
+        time_ms = min(time_ms, self.replay.end_time)
+        while self.index < len(inputs) and inputs[self.index][0] <= time_ms:
+            t, action = inputs[self.index]
+            state.tick(t - state.time_ms)
+            state.step(action)
+            self.index += 1
+        if time_ms > state.time_ms:
+            state.tick(time_ms - state.time_ms)
+        return state
+
+    def seek(self, time_ms):
+        """跳到任一時間點（可往回）。"""
+        time_ms = max(0, min(time_ms, self.replay.end_time))
+        if time_ms < self.state.time_ms or self._keyframe_ahead(time_ms):
+            k = bisect.bisect_right(self.replay._key_times, time_ms) - 1
+            if k >= 0:
+                t, index, snap = self.replay.keyframes[k]
+                self.state.restore(decode_snapshot(snap))
+                self.index = index
+            else:
+                self.state = self.replay.new_state()
+                self.index = 0
+        return self.advance_to(time_ms)
+
+    def _keyframe_ahead(self, time_ms):
+        """time_ms 之前是否有比目前位置更新的 keyframe（可直接跳過去）。"""
+        k = bisect.bisect_right(self.replay._key_times, time_ms) - 1
+        return k >= 0 and self.replay.keyframes[k][1] > self.index
+
+    @property
+    def finished(self):
+        return self.state.time_ms >= self.replay.end_time or self.state.over
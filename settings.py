@@ -1,6 +1,5 @@
 
 import os
-import pygame
 
 # === 基本設定 ===
 CELL_SIZE = 24           # 單一方塊像素大小
@@ -9,12 +8,42 @@ BOARD_ROWS = 20
 SIDE_PANEL_WIDTH_RATIO = 1/3   # 旁邊黑色區域相對遊戲區寬度
 
 FPS = 60
+# 遊戲邏輯固定以 LOGIC_HZ 步進（與 FPS 無關）；一個畫面最多補跑 MAX_LOGIC_STEPS 步
+LOGIC_HZ = 240
+MAX_LOGIC_STEPS = 24
+# 等待下一幀時每隔幾毫秒輪詢一次輸入（按鍵時間戳的精度）
+INPUT_POLL_MS = 1
+
+# 效能量測：匯出位置、疊加資訊更新間隔 (ms)
+PROFILE_DIR        = os.path.join(os.path.dirname(__file__), "Profiles")
+PROFILE_OVERLAY_MS = 250
 
 # 預設難度
 DIFFICULTY = "Easy"  
 # 預設 Easy
 DIFFICULTY_idx = 0
 
+# 方塊產生方式："bag" = 7-bag、"random" = 經典完全隨機
+RANDOMIZER = "bag"
+# 側欄顯示幾顆 next 方塊
+PREVIEW_COUNT = 5
+# 落點預覽（ghost piece）及其不透明度 (0~255)
+GHOST_PIECE = True
+GHOST_ALPHA = 80
+
+# 重播：每局（Demo 除外）自動錄製到 REPLAY_DIR
+RECORD_REPLAYS = True
+REPLAY_DIR     = os.path.join(os.path.dirname(__file__), "Replays")
+
+# 主選單閒置多久後自動進入 Demo（Bot 遊玩）模式 (ms)
+ATTRACT_DELAY = 20000
+
+# 觀戰牆（python main.py --wall N）：視窗大小、Bot 每個輸入的間隔 / 搜尋深度、結束後多久重開一局 (ms)
+WALL_SIZE          = (1280, 720)
+WALL_BOT_ACTION_MS = 50
+WALL_BOT_DEPTH     = 1
+WALL_RESTART_MS    = 3000
+
 # --- Movement auto-repeat (DAS & ARR) ---
 DAS_DELAY = 200   # 延遲自動移動啟動 (ms)
 ARR_SPEED = 40    # 自動移動間隔 (ms)
@@ -27,21 +56,33 @@ SCREEN_WIDTH   = BOARD_WIDTH_PX + SIDE_PANEL_PX * 2
 SCREEN_HEIGHT  = BOARD_HEIGHT_PX
 
 ASSET_DIR      = os.path.join(os.path.dirname(__file__), "Material")
+# 解碼後的圖片 / 音效快取（見 assets.py）；刪掉資料夾即可強制重建
+ASSET_CACHE     = True
+ASSET_CACHE_DIR = os.path.join(os.path.dirname(__file__), ".asset_cache")
 MUSIC_DIR      = os.path.join(os.path.dirname(__file__), "Background_music")
 
 # 循環音樂
 MUSIC_FILES    = [os.path.join(MUSIC_DIR, f"music{i}.mp3") for i in range(1,6)]
 
 # 鍵盤按鍵 (可在 Setting 介面變更)
-DEFAULT_KEYS   = {
-    "LEFT": pygame.K_LEFT,
-    "RIGHT": pygame.K_RIGHT,
-    "DOWN": pygame.K_DOWN,
-    "ROTATE": pygame.K_UP,
-    "HARD_DROP": pygame.K_SPACE,
-    "HOLD": pygame.K_LSHIFT
+# DEFAULT_KEYS 第一次被讀取時才 import pygame，headless 模擬不需要 pygame
+_DEFAULT_KEY_NAMES = {
+    "LEFT": "K_LEFT",
+    "RIGHT": "K_RIGHT",
+    "DOWN": "K_DOWN",
+    "ROTATE": "K_UP",
+    "HARD_DROP": "K_SPACE",
+    "HOLD": "K_LSHIFT"
 }
 
+def __getattr__(name):
+    if name == "DEFAULT_KEYS":
+        import pygame
+        keys = {action: getattr(pygame, const) for action, const in _DEFAULT_KEY_NAMES.items()}
+        globals()["DEFAULT_KEYS"] = keys
+        return keys
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 # 顏色 (備用)
 COLORS = [
     (0,0,0),
@@ -0,0 +1,84 @@
+"""封存檔：寫入 → 讀回的往返、未正常關閉時的接續寫入、生成器未跑完時關閉。"""
+import pytest
+
+import ai
+import archive
+import engine
+
+
+@pytest.fixture(scope="module")
+def games():
+    """三局短的 AI 對局：(GameLog 記下的落點, ArchiveWriter.add() 的參數)。"""
+    out = []
+    for seed in range(3):
+        state = engine.GameState(seed=seed)
+        log = archive.GameLog(state)
+        while not state.over and state.pieces < 40:
+            move = ai.state_move(state)
+            for action in move.actions if move else (engine.HARD_DROP,):
+                state.step(action)
+        spots = list(log.placements)
+        out.append((spots, log.finish(state)))
+    return out
+
+
+def write(path, games):
+    with archive.ArchiveWriter(path) as w:
+        for _, payload in games:
+            w.add(*payload)
+
+
+def test_round_trip(tmp_path, games):
+    path = str(tmp_path / "games.tra")
+    write(path, games)
+    with archive.ArchiveReader(path) as reader:
+        assert len(reader) == len(games)
+        for i, (spots, (_, seed, score, pieces)) in enumerate(games):
+            entry = reader.entry(i)
+            assert (entry.seed, entry.score, entry.pieces) == (seed, score, pieces)
+            assert [tuple(p)[2:] for p in reader.placements(i)] == spots
+            assert reader.seed_sequence(i, 1) == [engine.GameState(seed=seed).current.shape_key]
+        assert list(reader.entries()) == [reader.entry(i) for i in range(len(games))]
+
+
+def test_append_after_crash(tmp_path, games):
+    """writer 沒有 close()（標頭沒有索引）且最後一局只寫了一半：接續寫入時重建索引。"""
+    path = str(tmp_path / "games.tra")
+    w = archive.ArchiveWriter(path)
+    for _, payload in games[:2]:
+        w.add(*payload)
+    w.f.write(games[2][1][0][:7])
+    w.f.close()
+
+    with archive.ArchiveWriter(path, append=True) as w:
+        assert [e[2:] for e in w.entries] == [payload[1:] for _, payload in games[:2]]
+        w.add(*games[2][1])
+    with archive.ArchiveReader(path) as reader:
+        assert [tuple(e)[2:] for e in reader.entries()] == [payload[1:] for _, payload in games]
+        assert [tuple(p)[2:] for p in reader.placements(2)] == games[2][0]
+
+
+def test_close_with_live_generators(tmp_path, games):
+    path = str(tmp_path / "games.tra")
+    write(path, games)
+    reader = archive.ArchiveReader(path)
+    boards, entries = reader.iter_boards(), reader.entries()
+    next(boards)
+    next(entries)
+    reader.close()
+
+
+def test_crash_after_append(tmp_path, games):
+    """接續寫入後又沒有 close()：舊索引已被新資料覆蓋，下次接續仍要找回全部對局。"""
+    path = str(tmp_path / "games.tra")
+    write(path, games[:1])
+    w = archive.ArchiveWriter(path, append=True)
+    w.add(*games[1][1])
+    w.f.close()
+
+    with archive.ArchiveWriter(path, append=True) as w:
+        w.add(*games[2][1])
+    with archive.ArchiveReader(path) as reader:
+        assert [tuple(e)[2:] for e in reader.entries()] == [payload[1:] for _, payload in games]
+        for i, (spots, _) in enumerate(games):
+            assert [tuple(p)[2:] for p in reader.placements(i)] == spots
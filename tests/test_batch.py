@@ -0,0 +1,36 @@
+"""BatchSim 的方塊產生方式與 GameState 相同（預設 7-bag）。"""
+import numpy as np
+
+import batch
+import engine
+from tetromino import SHAPE_KEYS
+
+
+def dealt_shapes(sim, steps, rng):
+    """以隨機的 HARD_DROP 推進（game over 的盤面重開一局），回傳每一局依序出現的方塊（不含 HOLD）。"""
+    games = []
+    current = [[int(s)] for s in sim.shape]
+    for _ in range(steps):
+        drop = rng.random(sim.n) < 0.5
+        sim.step(np.where(drop, batch.HARD_DROP, batch.NOOP))
+        over = sim.over.copy()
+        sim.reset(over)
+        for i in np.nonzero(drop | over)[0]:
+            if over[i]:
+                games.append(current[i])
+                current[i] = []
+            current[i].append(int(sim.shape[i]))
+    return games + current
+
+
+def test_default_randomizer_matches_engine():
+    assert batch.BatchSim(1).randomizer == engine.GameState().randomizer
+
+
+def test_bag_deals_every_shape_once_per_bag():
+    sim = batch.BatchSim(32, seed=0, randomizer="bag")
+    games = dealt_shapes(sim, 200, np.random.default_rng(0))
+    assert sum(len(seq) // len(SHAPE_KEYS) for seq in games) > 100
+    for seq in games:
+        for i in range(0, len(seq) - len(SHAPE_KEYS) + 1, len(SHAPE_KEYS)):
+            assert sorted(seq[i:i + len(SHAPE_KEYS)]) == list(range(len(SHAPE_KEYS)))
@@ -0,0 +1,52 @@
+"""Board.stats() 的增量欄高 / 洞數 / 每列格數必須與整盤重新掃描的結果一致。"""
+import random
+
+import pytest
+
+import ai
+import engine
+from board import column_stats, summarize
+
+
+def rescan(board):
+    heights, holes = column_stats(board.rows)
+    fill = [bin(row).count("1") for row in board.rows]
+    return tuple(heights), tuple(holes), tuple(fill), summarize(heights, holes)
+
+
+def check(board):
+    stats = board.stats()
+    heights, holes, fill, summary = rescan(board)
+    assert stats.heights == heights
+    assert stats.column_holes == holes
+    assert stats.row_fill == fill
+    assert tuple(stats[3:]) == tuple(summary)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_inputs(seed):
+    """隨機按鍵與重力：包含踢牆、hold、軟降與偶爾的消行。"""
+    rng = random.Random(seed)
+    state = engine.GameState(seed=seed)
+    for _ in range(1500):
+        if state.over:
+            break
+        state.step(rng.choice(engine.ACTIONS))
+        state.tick(rng.choice((0, 0, 16, 400)))
+        check(state.board)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_bot_games(seed):
+    """AI 對局會大量消行（含多行同時消除），並經過 snapshot / restore。"""
+    state = engine.GameState(seed=seed)
+    table = ai.TranspositionTable(maxsize=5_000)
+    while not state.over and state.pieces < 150:
+        move = ai.state_move(state, table=table)
+        for action in move.actions if move else (engine.HARD_DROP,):
+            state.step(action)
+        check(state.board)
+        if state.pieces % 25 == 0:
+            state.restore(state.snapshot())
+            check(state.board)
+    assert state.lines > 0
@@ -0,0 +1,67 @@
+"""強化學習環境：觀察值與引擎狀態一致、相同 seed 可重現、VectorEnv 自動 reset 的 info。"""
+import numpy as np
+import pytest
+
+import env
+from board import column_stats
+
+
+def random_actions(e, rng):
+    return rng.choice(np.flatnonzero(e.action_mask))
+
+
+@pytest.mark.parametrize("mode", [env.PLACEMENT, env.KEYPRESS])
+def test_observation_matches_state(mode):
+    e = env.TetrisEnv(mode, max_steps=300)
+    rng = np.random.default_rng(0)
+    obs, info = e.reset(seed=1)
+    done = False
+    while not done:
+        action = random_actions(e, rng) if mode == env.PLACEMENT else rng.integers(env.NOOP + 1)
+        obs, reward, terminated, truncated, info = e.step(action)
+        done = terminated or truncated
+        board = e.state.board
+        expected = [[bool(row >> x & 1) for x in range(env.BOARD_COLS)] for row in board.rows]
+        assert (e.board == np.array(expected, np.int8)).all()
+        assert list(e.heights) == column_stats(board.rows)[0]
+        assert info["score"] == e.state.score and info["steps"] == e.steps
+
+
+def test_same_seed_same_episode():
+    def play(seed):
+        e = env.TetrisEnv()
+        rng = np.random.default_rng(3)
+        obs, _ = e.reset(seed=seed)
+        trace = [obs.copy()]
+        for _ in range(100):
+            obs, reward, terminated, _, _ = e.step(random_actions(e, rng))
+            trace.append(obs.copy())
+            if terminated:
+                break
+        return trace
+
+    assert all((a == b).all() for a, b in zip(play(7), play(7)))
+
+
+def test_vector_env_final_info():
+    n = 3
+    vec = env.VectorEnv(n, max_steps=40)
+    obs, infos = vec.reset(seed=0)
+    assert obs.shape == (n, env.observation_size())
+    rng = np.random.default_rng(0)
+    finished = 0
+    for _ in range(120):
+        actions = [random_actions(e, rng) for e in vec.envs]
+        before = [e.state.score for e in vec.envs]
+        obs, rewards, terminated, truncated, infos = vec.step(actions)
+        for i in range(n):
+            if terminated[i] or truncated[i]:
+                finished += 1
+                final = infos[i]["final_info"]
+                assert final["score"] == before[i] + rewards[i]
+                assert final["steps"] > 0 and infos[i]["steps"] == 0
+                assert infos[i]["final_observation"].shape == obs[i].shape
+            else:
+                assert "final_info" not in infos[i]
+        assert all(info is not e.info for info, e in zip(infos, vec.envs))
+    assert finished
@@ -0,0 +1,67 @@
+"""T-Spin 只在 T 方塊最後一個成功的動作是旋轉時計分；之後平移或下落過就是一般消行。"""
+import numpy as np
+
+import batch
+import engine
+from tetromino import SHAPE_KEYS, Tetromino
+
+# 底部兩列留一個朝下的 T 形洞；overhang=True 時洞口左上方有遮蓋，只能轉進去
+SLOT_X, SLOT_Y = 3, 17                     # 朝下（r=2）的 T 剛好填滿洞的位置
+
+
+def slot_grid(overhang):
+    grid = [[0] * 10 for _ in range(20)]
+    for x in range(10):
+        if x != 4:
+            grid[19][x] = 1
+        if x not in (3, 4, 5):
+            grid[18][x] = 1
+    if overhang:
+        grid[16][3] = grid[17][3] = 1
+    return grid
+
+
+def engine_score(overhang, r, x, y, rotated, actions):
+    state = engine.GameState(seed=0)
+    state.board.set_grid(slot_grid(overhang))
+    piece = Tetromino("T")
+    piece.r, piece.x, piece.y, piece.rotated = r, x, y, rotated
+    state.current = piece
+    for action in actions:
+        assert state.step(action)
+    assert state.lines == 2
+    return state.score, state.tspins
+
+
+def batch_score(overhang, r, x, y, rotated, actions):
+    sim = batch.BatchSim(1, seed=0)
+    sim.rows[0] = [sum(1 << x for x, v in enumerate(row) if v) for row in slot_grid(overhang)]
+    sim.shape[0], sim.rot[0], sim.x[0], sim.y[0] = SHAPE_KEYS.index("T"), r, x, y
+    sim.rotated[0] = rotated
+    for action in actions:
+        sim.step(np.array([engine.ACTIONS.index(action)]))
+    assert sim.lines[0] == 2
+    return int(sim.score[0])
+
+
+def check(expected, *case):
+    assert engine_score(*case)[0] == expected
+    assert batch_score(*case) == expected
+
+
+def test_spin_into_slot_scores_tspin_double():
+    case = (True, 1, SLOT_X, SLOT_Y, False, [engine.ROTATE, engine.HARD_DROP])
+    check(12, *case)
+    assert engine_score(*case)[1] == 1
+
+
+def test_shift_after_rotation_is_not_a_tspin():
+    case = (False, 2, SLOT_X + 1, SLOT_Y - 2, True, [engine.LEFT, engine.HARD_DROP])
+    check(3, *case)
+    assert engine_score(*case)[1] == 0
+
+
+def test_drop_after_rotation_is_not_a_tspin():
+    check(3, False, 2, SLOT_X, SLOT_Y - 3, True, [engine.HARD_DROP])
+    check(3, False, 2, SLOT_X, SLOT_Y - 3, True, [engine.SOFT_DROP, engine.SOFT_DROP, engine.SOFT_DROP,
+                                                   engine.HARD_DROP])
@@ -2,12 +2,16 @@ from __future__ import annotations
 
 import os
 import random
-from typing import List, Tuple, Dict
-
-import pygame
+from collections import deque
+from itertools import islice
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Dict, List, Mapping, NamedTuple, Tuple
 
 from settings import CELL_SIZE, ASSET_DIR, COLORS
 
+if TYPE_CHECKING:  # pygame is only needed for drawing; the rules stay headless
+    import pygame
+
 # -----------------------------------------------------------------------------
 # Shape definitions (spawn/orientation 0)
 # -----------------------------------------------------------------------------
@@ -69,29 +73,77 @@ SHAPE_KEYS = list(SHAPES.keys())
 # Block sprite loading helper
 # -----------------------------------------------------------------------------
 
-def load_block_images() -> List[pygame.Surface]:
-    surfaces: List[pygame.Surface] = [pygame.Surface((CELL_SIZE, CELL_SIZE), pygame.SRCALPHA)]
+class SpriteAtlas:
+    """Block sprites pre-scaled per cell size.
+
+    ``atlas[cid]`` is the board-sized (``CELL_SIZE``) sprite for colour id
+    *cid*, so the atlas is a drop-in replacement for the old list of surfaces.
+    ``atlas.get(cid, size)`` hands out the cached variant for any other size;
+    sizes not built up front are scaled once on first use and kept.
+    """
+
+    def __init__(self, sources: List[pygame.Surface | Tuple[int, int, int] | None], sizes=()):
+        self.sources = sources       # sheet sub-surface, fallback RGB colour, or None for id 0
+        self.sprites: Dict[Tuple[int, int], pygame.Surface] = {}
+        self.prescale((CELL_SIZE, *sizes))
+
+    def _build(self, cid: int, size: int) -> pygame.Surface:
+        import pygame
+
+        src = self.sources[cid]
+        if src is None:
+            return pygame.Surface((size, size), pygame.SRCALPHA)
+        if isinstance(src, tuple):  # plain colour fallback
+            surf = pygame.Surface((size, size))
+            surf.fill(src)
+            return surf
+        return pygame.transform.scale(src, (size, size))
+
+    def prescale(self, sizes) -> None:
+        for size in sizes:
+            for cid in range(len(self.sources)):
+                if (cid, size) not in self.sprites:
+                    self.sprites[cid, size] = self._build(cid, size)
+
+    def get(self, cid: int, size: int = CELL_SIZE) -> pygame.Surface:
+        sprite = self.sprites.get((cid, size))
+        if sprite is None:
+            sprite = self.sprites[cid, size] = self._build(cid, size)
+        return sprite
+
+    def __getitem__(self, cid: int) -> pygame.Surface:
+        return self.sprites[cid, CELL_SIZE]
+
+    def __len__(self) -> int:
+        return len(self.sources)
+
+    def sizes(self) -> List[int]:
+        return sorted({size for _, size in self.sprites})
+
+
+def load_block_images(sizes=()) -> SpriteAtlas:
+    """Load the block sheet once and pre-scale it for ``CELL_SIZE`` plus *sizes*."""
+    import pygame
+    import assets
+
+    sources: List[pygame.Surface | Tuple[int, int, int] | None] = [None]
 
     sprite_path = os.path.join(ASSET_DIR, "All_color_blocks.png")
     if not os.path.exists(sprite_path):
         sprite_path = os.path.join(ASSET_DIR, "All_color_blocks.jpg")
 
     if os.path.exists(sprite_path):
-        sheet = pygame.image.load(sprite_path).convert_alpha()
+        sheet = assets.load_image(sprite_path)
         h = sheet.get_height()
         count = sheet.get_width() // h
         for i in range(count):
-            sub = sheet.subsurface((i * h, 0, h, h))
-            surfaces.append(pygame.transform.scale(sub, (CELL_SIZE, CELL_SIZE)))
+            sources.append(sheet.subsurface((i * h, 0, h, h)))
 
     else:
-        for c in COLORS[1:]:
-            surf = pygame.Surface((CELL_SIZE, CELL_SIZE))
-            surf.fill(c)
-            surfaces.append(surf)
-    return surfaces
+        sources.extend(COLORS[1:])
+    return SpriteAtlas(sources, sizes)
 
-BLOCK_IMAGES: List[pygame.Surface] | None = None
+BLOCK_IMAGES: SpriteAtlas | None = None
 
 # -----------------------------------------------------------------------------
 # Kick tables (Y↓)
@@ -141,54 +193,118 @@ def _rotate_matrix(matrix: List[List[int]], pivot: Tuple[int, int], cw: bool) ->
             new[nr][nc] = val
     return new
 
+
+# -----------------------------------------------------------------------------
+# Rotation-state table – every shape x orientation computed once at import
+# -----------------------------------------------------------------------------
+
+class Orientation(NamedTuple):
+    """Immutable geometry of one shape in one orientation.
+
+    ``masks`` holds ``(row, bits)`` per occupied matrix row, with bit 0
+    standing for column ``left``; ``cells`` holds ``(col, row)`` offsets.
+    """
+
+    left: int
+    right: int
+    top: int
+    bottom: int
+    masks: Tuple[Tuple[int, int], ...]
+    cells: Tuple[Tuple[int, int], ...]
+    matrix: Tuple[Tuple[int, ...], ...]
+    color: int
+
+
+def _orientation(matrix: List[List[int]]) -> Orientation:
+    cells = tuple((c, r) for r, row in enumerate(matrix) for c, val in enumerate(row) if val)
+    left = min(c for c, _ in cells)
+    right = max(c for c, _ in cells)
+    top = min(r for _, r in cells)
+    bottom = max(r for _, r in cells)
+    masks = []
+    for r in range(top, bottom + 1):
+        bits = 0
+        for c, cr in cells:
+            if cr == r:
+                bits |= 1 << (c - left)
+        masks.append((r, bits))
+    color = matrix[cells[0][1]][cells[0][0]]
+    return Orientation(left, right, top, bottom, tuple(masks), cells,
+                       tuple(tuple(row) for row in matrix), color)
+
+
+def _build_rotations() -> Mapping[str, Tuple[Orientation, ...]]:
+    table = {}
+    for key, matrix in SHAPES.items():
+        piv = PIVOT.get(key, PIVOT["default"])
+        states = [matrix]
+        for _ in range(3):
+            states.append(_rotate_matrix(states[-1], piv, cw=True))
+        table[key] = tuple(_orientation(m) for m in states)
+    return MappingProxyType(table)
+
+
+# ROTATIONS[shape][r] – r follows SRS orientation (0 = spawn, 1 = CW, ...)
+ROTATIONS = _build_rotations()
+
+KICKS: Mapping[str, Dict[Tuple[int, int], List[Tuple[int, int]]]] = MappingProxyType(
+    {key: I_KICKS if key == "I" else JLSTZ_KICKS for key in SHAPES}
+)
+
 # -----------------------------------------------------------------------------
 # Tetromino class
 # -----------------------------------------------------------------------------
 
 class Tetromino:
-    """Single falling tetromino with SRS rotation."""
+    """Single falling tetromino with SRS rotation.
+
+    Only shape, orientation index and position are stored; all geometry
+    comes from ``ROTATIONS``.
+    """
+
+    __slots__ = ("shape_key", "r", "x", "y", "rotated")
 
     ROT_DIR = {+1: 1, -1: -1}
 
     def __init__(self, shape: str):
         self.shape_key = shape
-        self.matrix = [row[:] for row in SHAPES[shape]]
         self.x, self.y = 0, -4  # spawn slightly above board
         self.r = 0  # orientation 0 = spawn
+        self.rotated = False
 
-    # ---------------- 旋轉 ----------------
-    def _apply_rotation(self, cw: bool):
-        piv = PIVOT.get(self.shape_key, PIVOT["default"])
-        self.matrix = _rotate_matrix(self.matrix, piv, cw)
+    # ---------------- 形狀 ----------------
+    def orientation(self) -> Orientation:
+        return ROTATIONS[self.shape_key][self.r]
+
+    @property
+    def matrix(self) -> Tuple[Tuple[int, ...], ...]:
+        return ROTATIONS[self.shape_key][self.r].matrix
 
+    # ---------------- 旋轉 ----------------
     def rotate(self, direction: int, board) -> bool:
         if self.shape_key == "O":
             return True
-        else:
-            if direction not in self.ROT_DIR:
-                return False
-            old_r = self.r
-            new_r = (self.r + self.ROT_DIR[direction]) % 4
-            # 先計算旋轉矩陣
-            self._apply_rotation(cw=(direction == 1))
-            kicks = I_KICKS if self.shape_key == "I" else JLSTZ_KICKS
-
-            for dx, dy in kicks[(old_r, new_r)]:
-                if board.valid_position(self, dx=dx, dy=dy):
-                    self.x += dx
-                    self.y += dy
-                    self.r = new_r
-                    return True
-                
-            # 若全部 Kick 失敗 → 恢復
-            self._apply_rotation(cw=(direction == -1))  # 逆向轉回
+        if direction not in self.ROT_DIR:
             return False
+        old_r = self.r
+        new_r = (old_r + self.ROT_DIR[direction]) % 4
+        self.r = new_r
+
+        for dx, dy in KICKS[self.shape_key][(old_r, new_r)]:
+            if board.valid_position(self, dx=dx, dy=dy):
+                self.x += dx
+                self.y += dy
+                return True
+
+        # 若全部 Kick 失敗 → 恢復
+        self.r = old_r
+        return False
+
     # ---------------- 座標輸出 ----------------
-    def get_cells(self):
-        for ry, row in enumerate(self.matrix):
-            for cx, val in enumerate(row):
-                if val:
-                    yield self.x + cx, self.y + ry, val
+    def get_cells(self) -> List[Tuple[int, int, int]]:
+        o = ROTATIONS[self.shape_key][self.r]
+        x, y, val = self.x, self.y, o.color
+        return [(x + cx, y + cy, val) for cx, cy in o.cells]
 
     # ---------------- 其他 ----------------
     def __repr__(self):
@@ -199,14 +315,59 @@ class Tetromino:
 # 工具函式
 # -----------------------------------------------------------------------------
 
-def random_tetromino() -> Tetromino:
-    return Tetromino(random.choice(SHAPE_KEYS))
+def random_tetromino(rng: random.Random | None = None) -> Tetromino:
+    return Tetromino((rng or random).choice(SHAPE_KEYS))
+
+
+class PieceGenerator:
+    """Seeded piece sequence with a look-ahead preview queue.
+
+    ``mode="bag"`` deals shuffled bags of all 7 shapes; ``mode="random"`` picks
+    each shape uniformly (classic).  The same seed and mode always yield the
+    same sequence.
+    """
+
+    MODES = ("bag", "random")
+
+    def __init__(self, seed=None, mode: str = "bag"):
+        if mode not in self.MODES:
+            raise ValueError(f"unknown randomizer mode: {mode!r}")
+        self.seed = seed
+        self.mode = mode
+        self.rng = random.Random(seed)
+        self.dealt = 0                    # pieces handed out by next()
+        self._queue: deque = deque()
+
+    def _refill(self):
+        if self.mode == "bag":
+            bag = list(SHAPE_KEYS)
+            self.rng.shuffle(bag)
+            self._queue.extend(Tetromino(k) for k in bag)
+        else:
+            self._queue.append(Tetromino(self.rng.choice(SHAPE_KEYS)))
+
+    def peek(self, n: int = 1) -> List[Tetromino]:
+        """The next *n* pieces, without consuming them."""
+        while len(self._queue) < n:
+            self._refill()
+        return list(islice(self._queue, n))
+
+    def next(self) -> Tetromino:
+        if not self._queue:
+            self._refill()
+        self.dealt += 1
+        return self._queue.popleft()
 
 __all__ = [
     "SHAPES",
     "PIVOT",
+    "ROTATIONS",
+    "KICKS",
+    "Orientation",
+    "SpriteAtlas",
     "load_block_images",
     "BLOCK_IMAGES",
     "Tetromino",
     "random_tetromino",
+    "PieceGenerator",
 ]                 
\ No newline at end of file
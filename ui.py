@@ -1,40 +1,79 @@
-import pygame, sys, os
+import pygame, os
 import settings as cfg
-from settings import SCREEN_WIDTH, SCREEN_HEIGHT, FPS, DEFAULT_KEYS, MUSIC_FILES
+from settings import SCREEN_WIDTH, SCREEN_HEIGHT, FPS, DEFAULT_KEYS, MUSIC_FILES, ATTRACT_DELAY
+from cache import LRUCache
+import assets
 
 WHITE, YELLOW, BG = (255,255,255), (255,220,0), (25,25,25)
 
+# ---------- 文字快取 ----------
+class TextCache:
+    """字型只建立一次；文字 surface 依 (字型, 文字, 顏色) 快取，值沒變就不重新點陣化。"""
+
+    def __init__(self, maxsize=512):
+        self.fonts = {}
+        self.surfaces = LRUCache(maxsize)
+
+    def font(self, size, bold=False, name=None):
+        key = (name, size, bold)
+        f = self.fonts.get(key)
+        if f is None:
+            f = self.fonts[key] = pygame.font.SysFont(name, size, bold=bold)
+        return f
+
+    def render(self, text, color, size, bold=False, name=None):
+        key = (name, size, bold, text, color)
+        surf = self.surfaces.get(key)
+        if surf is None:
+            surf = self.font(size, bold, name).render(text, True, color)
+            self.surfaces.put(key, surf)
+        return surf
+
+TEXT = TextCache()
+
 # ---------- UI ----------
 class Button:
     def __init__(self, txt, font, center):
         self.txt, self.font = txt, font
-        self.rect = font.render(txt,True,WHITE).get_rect(center=center)
+        self.images = {False: font.render(txt,True,WHITE), True: font.render(txt,True,YELLOW)}
+        self.rect = self.images[False].get_rect(center=center)
     def draw(self,surf,hover):
-        surf.blit(self.font.render(self.txt,True,YELLOW if hover else WHITE),self.rect)
+        surf.blit(self.images[bool(hover)],self.rect)
 
 class MenuUI:
+    START, DEMO, SETTINGS, QUIT = range(4)
+
     def __init__(self,screen):
         self.s, self.clock = screen, pygame.time.Clock()
-        f=pygame.font.SysFont(None,60)
-        self.btn=[Button("Start",f,(SCREEN_WIDTH//2,SCREEN_HEIGHT//2-80)),
-                  Button("Settings",f,(SCREEN_WIDTH//2,SCREEN_HEIGHT//2)),
-                  Button("Quit",f,(SCREEN_WIDTH//2,SCREEN_HEIGHT//2+80))]
+        f=TEXT.font(60)
+        self.btn=[Button("Start",f,(SCREEN_WIDTH//2,SCREEN_HEIGHT//2-120)),
+                  Button("Demo",f,(SCREEN_WIDTH//2,SCREEN_HEIGHT//2-40)),
+                  Button("Settings",f,(SCREEN_WIDTH//2,SCREEN_HEIGHT//2+40)),
+                  Button("Quit",f,(SCREEN_WIDTH//2,SCREEN_HEIGHT//2+120))]
         bgp=os.path.join(os.path.dirname(__file__),"Material","main_background.jpg")
-        self.bg=pygame.transform.scale(pygame.image.load(bgp),(SCREEN_WIDTH,SCREEN_HEIGHT)) if os.path.exists(bgp) else None
+        self.bg=assets.load_image(bgp,(SCREEN_WIDTH,SCREEN_HEIGHT),alpha=False) if os.path.exists(bgp) else None
 
     def run(self):
+        idle_since = pygame.time.get_ticks()
         while True:
             self.clock.tick(FPS)
+            # 閒置太久 → 自動 Demo
+            if pygame.time.get_ticks() - idle_since >= ATTRACT_DELAY: return self.DEMO
             for e in pygame.event.get():
-                if e.type==pygame.QUIT: pygame.quit(); sys.exit()
+                if e.type==pygame.QUIT: return self.QUIT      # 由呼叫端關閉（需先等音訊執行緒）
+                if e.type in (pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN, pygame.KEYDOWN):
+                    idle_since = pygame.time.get_ticks()
                 if e.type==pygame.MOUSEBUTTONDOWN and e.button==1:
                     for i,b in enumerate(self.btn):
                         if b.rect.collidepoint(e.pos): return i
-            if self.bg: self.s.blit(self.bg,(0,0))
-            else: self.s.fill((0,0,0))
-            mp=pygame.mouse.get_pos()
-            for b in self.btn: b.draw(self.s,b.rect.collidepoint(mp))
-            pygame.display.flip()
+            self.draw()
+
+    def draw(self):
+        if self.bg: self.s.blit(self.bg,(0,0))
+        else: self.s.fill((0,0,0))
+        mp=pygame.mouse.get_pos()
+        for b in self.btn: b.draw(self.s,b.rect.collidepoint(mp))
+        pygame.display.flip()
 
 # ---------- 設定 ----------
 class SettingUI():
@@ -43,7 +82,7 @@ class SettingUI():
 
     def __init__(self, scr, keys_map):
         self.s, self.clock = scr, pygame.time.Clock()
-        self.font = pygame.font.SysFont(None, 32)
+        self.font = TEXT.font(32)
         self.keys = keys_map
         self.wait = None
         self.music_on, self.sfx_on = cfg.MUSIC_ON, cfg.SFX_ON
@@ -86,16 +125,17 @@ class SettingUI():
                     if pygame.Rect(60, self.start_y + len(self.ACTIONS) * self.line_h + 15, 300, self.line_h).collidepoint((mx, my)):
                         self.music_on = not self.music_on
 
-                        if self.music_on:
-                            if not pygame.mixer.music.get_busy() and MUSIC_FILES:
-                                pygame.mixer.music.load(MUSIC_FILES[0])
-                                pygame.mixer.music.play()
+                        if pygame.mixer.get_init():          # 沒有音訊裝置時只記下設定
+                            if self.music_on:
+                                if not pygame.mixer.music.get_busy() and MUSIC_FILES:
+                                    pygame.mixer.music.load(MUSIC_FILES[0])
+                                    pygame.mixer.music.play()
 
-                            else:
-                                pygame.mixer.music.unpause()
+                                else:
+                                    pygame.mixer.music.unpause()
 
-                        else:
-                            pygame.mixer.music.pause()
+                            else:
+                                pygame.mixer.music.pause()
 
                     # SFX toggle
                     if pygame.Rect(60, self.start_y + len(self.ACTIONS) * self.line_h + 65, 300, self.line_h).collidepoint((mx, my)):
@@ -115,14 +155,14 @@ class SettingUI():
                 
                 label = f"{a:<10}: {pygame.key.name(self.keys[a])}" if self.wait != a else f"{a:<10}: Press new key..."
                 col = YELLOW if self.wait == a else WHITE
-                self.s.blit(self.font.render(label, True, col), (80, self.start_y + i * self.line_h))
+                self.s.blit(TEXT.render(label, col, 32), (80, self.start_y + i * self.line_h))
 
-            self.s.blit(self.font.render(f"Background Music: {'ON' if self.music_on else 'OFF'}", True, YELLOW if self.music_on else WHITE),
+            self.s.blit(TEXT.render(f"Background Music: {'ON' if self.music_on else 'OFF'}", YELLOW if self.music_on else WHITE, 32),
                          (80, self.start_y + len(self.ACTIONS) * self.line_h + 15))
-            self.s.blit(self.font.render(f"Sound Effects: {'ON' if self.sfx_on else 'OFF'}", True, YELLOW if self.sfx_on else WHITE),
+            self.s.blit(TEXT.render(f"Sound Effects: {'ON' if self.sfx_on else 'OFF'}", YELLOW if self.sfx_on else WHITE, 32),
                          (80, self.start_y + len(self.ACTIONS) * self.line_h + 65))
 
-            self.s.blit(self.font.render(f"Game Difficulty: {self.DIFFICULTY_LEVELS[self.difficulty_idx]}", True, WHITE),
+            self.s.blit(TEXT.render(f"Game Difficulty: {self.DIFFICULTY_LEVELS[self.difficulty_idx]}", WHITE, 32),
             (80, self.start_y + len(self.ACTIONS) * self.line_h + 115))
             
             mp = pygame.mouse.get_pos()
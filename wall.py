@@ -0,0 +1,258 @@
+"""觀戰牆：一個視窗同時顯示多局 headless 對局（Bot 或重播），大廳螢幕展示用。
+
+    python main.py --wall 36                      # 36 局 Bot
+    python main.py --wall 16 --wall-replays Replays
+
+每局畫在自己的 subsurface 上，格子用 SpriteAtlas 預先縮放成同一個尺寸；已固定的格子
+各有一張圖層（盤面 version 變了才重畫），每幀只重畫內容有變的盤面並只 update 那些區域。
+"""
+import glob
+import math
+import os
+import random
+from collections import deque
+
+import pygame
+
+import settings as cfg
+from settings import BOARD_COLS, BOARD_ROWS, FPS
+import ai
+import engine
+import replay
+import tetromino
+from clock import RealClock
+from ui import TEXT
+
+LABEL_PX    = 14          # 盤面上方的分數列
+PAD_PX      = 6           # 盤面之間的間距
+MAX_STEP_MS = 250         # 視窗被拖曳等造成的長停頓，最多只補這麼多時間
+
+
+# ---------- 對局來源 ----------
+class BotFeed:
+    """AI 遊玩的一局；輸入以固定間隔在引擎時間上套用（同 TetrisGame.bot_update），
+    結束後停留 WALL_RESTART_MS 再以 seed + stride 開新局。"""
+
+    def __init__(self, seed, stride=1, difficulty=None, depth=None, action_ms=None):
+        self.seed, self.stride = seed, stride
+        self.difficulty = difficulty or cfg.DIFFICULTY
+        self.depth = depth or cfg.WALL_BOT_DEPTH
+        self.action_ms = action_ms or cfg.WALL_BOT_ACTION_MS
+        self.table = ai.TranspositionTable(maxsize=20_000)
+        self.new_game()
+
+    def new_game(self):
+        self.state = engine.GameState(difficulty=self.difficulty, seed=self.seed)
+        self.piece, self.actions, self.next_action = None, deque(), 0
+        self.over_ms = 0
+
+    def plan(self):
+        state = self.state
+        self.piece = state.current
+        move = ai.state_move(state, depth=self.depth, table=self.table)
+        self.actions = deque(move.actions if move else ())   # 沒有落點時交給重力
+
+    def advance(self, ms):
+        state = self.state
+        if state.over:
+            self.over_ms += ms
+            if self.over_ms >= cfg.WALL_RESTART_MS:
+                self.seed += self.stride
+                self.new_game()
+            return
+        end = state.time_ms + ms
+        while not state.over:
+            if state.current is not self.piece:
+                self.plan()
+            if not self.actions:
+                break
+            t = max(self.next_action, state.time_ms)
+            if t > end:
+                break
+            state.tick(t - state.time_ms)
+            if state.over or state.current is not self.piece:
+                continue                           # 被重力鎖定 → 重新規劃
+            action = self.actions.popleft()
+            if not state.step(action) and action != engine.SOFT_DROP:
+                self.piece = None                  # 路徑失效 → 重算
+            elif action == engine.HOLD:
+                self.piece = state.current         # 路徑已包含 HOLD 之後的動作
+            self.next_action = t + self.action_ms
+        if not state.over and end > state.time_ms:
+            state.tick(end - state.time_ms)
+        state.drain_events()
+
+
+class ReplayFeed:
+    """循環播放一個重播檔。"""
+
+    def __init__(self, path):
+        self.replay = replay.Replay.load(path)
+        self.restart()
+
+    def restart(self):
+        self.player = replay.Player(self.replay)
+        self.t, self.over_ms = 0, 0
+
+    @property
+    def state(self):
+        return self.player.state
+
+    def advance(self, ms):
+        if self.player.finished:
+            self.over_ms += ms
+            if self.over_ms >= cfg.WALL_RESTART_MS:
+                self.restart()
+            return
+        self.t = min(self.t + ms, self.replay.end_time)
+        self.player.advance_to(int(self.t))
+        self.state.drain_events()
+
+
+def replay_files(paths):
+    """展開資料夾（取其中的重播檔），依名稱排序。"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "*" + replay.EXTENSION))))
+        else:
+            files.append(path)
+    return files
+
+
+def make_feeds(count=None, replay_paths=(), seed=None):
+    """有重播檔時輪流分配給 count 個盤面（省略 count = 每個檔案一個），否則 count 局 Bot。"""
+    if replay_paths:
+        files = replay_files(replay_paths)
+        if not files:
+            raise ValueError("no replay files found")
+        return [ReplayFeed(files[i % len(files)]) for i in range(count or len(files))]
+    count = count or 16
+    seed = random.randrange(2 ** 32) if seed is None else seed
+    return [BotFeed(seed + i, stride=count) for i in range(count)]
+
+
+# ---------- 版面 ----------
+def layout(size, n):
+    """選出讓格子最大的欄數，回傳 (格子邊長, 欄數, 列數)。"""
+    w, h = size
+    best = None
+    for cols in range(1, n + 1):
+        rows = math.ceil(n / cols)
+        cell = min((w // cols - PAD_PX) // BOARD_COLS, (h // rows - PAD_PX - LABEL_PX) // BOARD_ROWS)
+        if best is None or cell > best[0]:
+            best = (cell, cols, rows)
+    if best[0] < 1:
+        raise ValueError(f"{n} boards do not fit in {w}x{h}")
+    return best
+
+
+class Tile:
+    """一局的顯示區：分數列＋盤面，畫在 screen 的 subsurface 上。"""
+
+    def __init__(self, screen, rect, cell, feed):
+        self.rect = rect
+        self.surface = screen.subsurface(rect)
+        self.cell = cell
+        self.feed = feed
+        self.layer = pygame.Surface((BOARD_COLS * cell, BOARD_ROWS * cell)).convert()
+        self.layer_key = None              # (Board, version)
+        self.key = None
+
+    def draw(self):
+        """內容有變才重畫，回傳要更新的區域（沒變時為 None）。"""
+        state = self.feed.state
+        board, piece = state.board, state.current
+        layer_key = (board, board.version)
+        key = (layer_key, piece.shape_key, piece.r, piece.x, piece.y, state.score, state.over)
+        if key == self.key:
+            return None
+        self.key = key
+
+        cell, surf = self.cell, self.surface
+        if layer_key != self.layer_key:
+            self.layer.fill((0, 0, 0))
+            board.draw(self.layer, 0, 0, cell)
+            self.layer_key = layer_key
+
+        surf.fill((0, 0, 0), (0, 0, self.rect.width, LABEL_PX))
+        surf.blit(TEXT.render(f"{state.score}  L{state.lines}", (255, 255, 255), 12), (1, 0))
+        surf.blit(self.layer, (0, LABEL_PX))
+        if state.over:
+            img = TEXT.render("GAME OVER", (255, 0, 0), max(12, cell * 2), bold=True)
+            surf.blit(img, img.get_rect(center=(self.rect.width // 2, LABEL_PX + BOARD_ROWS * cell // 2)))
+        else:
+            get = tetromino.BLOCK_IMAGES.get
+            surf.blits([(get(v, cell), (x * cell, LABEL_PX + y * cell))
+                        for x, y, v in piece.get_cells() if y >= 0], doreturn=False)
+        return self.rect
+
+
+# ---------- 主程式 ----------
+class SpectatorWall:
+    """ESC / 關閉視窗離開。"""
+
+    def __init__(self, screen, feeds, clock=None):
+        self.screen, self.feeds = screen, feeds
+        self.clock = clock or RealClock()
+        w, h = screen.get_size()
+        self.cell, cols, rows = layout((w, h), len(feeds))
+        tetromino.BLOCK_IMAGES.prescale([self.cell])
+
+        cw, ch = w // cols, h // rows
+        tw, th = BOARD_COLS * self.cell, LABEL_PX + BOARD_ROWS * self.cell
+        self.tiles = []
+        for i, feed in enumerate(feeds):
+            r, c = divmod(i, cols)
+            rect = pygame.Rect(c * cw + (cw - tw) // 2, r * ch + (ch - th) // 2, tw, th)
+            self.tiles.append(Tile(screen, rect, self.cell, feed))
+        self.running = False
+
+    def redraw_all(self):
+        self.screen.fill((0, 0, 0))
+        for tile in self.tiles:
+            tile.key = None
+            tile.draw()
+            pygame.draw.rect(self.screen, (90, 90, 90), tile.rect.inflate(2, 2), 1)   # 框線在 subsurface 外
+        pygame.display.flip()
+
+    def advance(self, ms):
+        for feed in self.feeds:
+            feed.advance(ms)
+
+    def render(self):
+        """只重畫有變動的盤面；回傳更新的區域。"""
+        dirty = [rect for rect in (tile.draw() for tile in self.tiles) if rect]
+        if dirty:
+            pygame.display.update(dirty)
+        return dirty
+
+    def run(self):
+        self.redraw_all()
+        self.running = True
+        frames, since = 0, self.clock.now()
+        while self.running:
+            dt = self.clock.tick(FPS)
+            for e in pygame.event.get():
+                if e.type == pygame.QUIT or (e.type == pygame.KEYDOWN and e.key == pygame.K_ESCAPE):
+                    self.running = False
+            self.advance(min(dt, MAX_STEP_MS))
+            self.render()
+
+            frames += 1
+            now = self.clock.now()
+            if now - since >= 1000:
+                pygame.display.set_caption(f"Tetris wall - {len(self.feeds)} games, "
+                                           f"{frames * 1000 / (now - since):.0f} FPS")
+                frames, since = 0, now
+
+
+def run(count=None, replay_paths=(), seed=None, size=None):
+    pygame.display.init()
+    pygame.font.init()
+    screen = pygame.display.set_mode(size or cfg.WALL_SIZE)
+    pygame.display.set_caption("Tetris wall")
+    if tetromino.BLOCK_IMAGES is None:
+        tetromino.BLOCK_IMAGES = tetromino.load_block_images()
+    SpectatorWall(screen, make_feeds(count, replay_paths, seed)).run()
+    pygame.quit()